@@ -1,109 +1,979 @@
+import heapq
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 import networkx as nx
 from typing import Union
 
-def Floyd(Graph : Union[nx.Graph, nx.DiGraph]) -> np.ndarray:
-    """返回最短路矩阵, 使用Floyd算法
+from codes.cache import DistanceCache
+from codes.compactGraph import CompactGraph, toCompactGraph
+from codes.heap import PairingHeap, RadixHeap
+from codes.packed import PackedSymmetricMatrix
+from codes.path import nextHopDtype
+from codes.stats import SearchStats, phaseTimer
+
+# heap='auto'时, 最大权重不超过该值的非负整数权重图使用Dial桶队列
+DIAL_MAX_WEIGHT = 1 << 16
+
+# 弧数超过n^2的该比例时, Johnson算法退化为Floyd算法
+JOHNSON_DENSE_RATIO = 0.25
+# 点数不少于该值时, Johnson算法才把各源点的Dijkstra分发到进程池
+JOHNSON_PARALLEL_MIN_NODES = 256
+
+# FloydBlocked默认的内存预算(字节), 所有线程同时驻留的分块总大小不超过该值
+FLOYD_BLOCK_MEMORY = 256 << 20
+
+# 写入DistanceCache的全源算法及其版本, 修改算法结果时递增版本号, 该算法写入的旧缓存条目随之失效
+APSP_VERSIONS = {'Floyd': 1, 'FloydBatch': 1, 'Johnson': 1}
+
+_SUPPORTED_DTYPES = (np.dtype(np.float64), np.dtype(np.float32), np.dtype(np.int64), np.dtype(np.int32))
+
+class NegativeCycleError(ValueError):
+    """图中存在从起点可达的负权重环
+
+    Attributes:
+        cycle (list): 负权重环上的点, 按边的方向排列
+    """
+
+    def __init__(self, cycle: list) -> None:
+        super().__init__(f"Negative cycle detected: {cycle}")
+        self.cycle = cycle
+
+def _infValue(dtype: np.dtype):
+    """返回dtype下表示不可达的值, 浮点类型为inf, 整数类型为该类型的最大值
 
     Args:
-        Graph (Union[nx.Graph, nx.DiGraph]): networkx.Graph / networkx.DiGraph 表示的图
+        dtype (np.dtype): 距离矩阵的数据类型
 
     Returns:
-        np.ndarray: 最短路矩阵
+        不可达距离的表示值
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max
+    return dtype.type(np.inf)
+
+def _edgeArray(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph]) -> tuple:
+    """将图的边一次性导出为(src, dst, weight)数组
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图
+
+    Returns:
+        tuple: (src, dst, weight), src/dst为np.intp数组, weight为np.float64数组
+    """
+    if isinstance(Graph, CompactGraph):
+        return Graph.src.astype(np.intp), Graph.dst.astype(np.intp), Graph.weight
+    edges = np.array(list(Graph.edges(data='weight')), dtype=np.float64).reshape(-1, 3)
+    return edges[:, 0].astype(np.intp), edges[:, 1].astype(np.intp), edges[:, 2]
+
+def _isDirected(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph]) -> bool:
+    """判断输入图是否为有向图"""
+    if isinstance(Graph, CompactGraph):
+        return Graph.directed
+    return isinstance(Graph, nx.DiGraph)
+
+def _initDistMatrix(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], dtype: np.dtype) -> np.ndarray:
+    """由边数组构造Floyd算法的初始距离矩阵
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图
+        dtype (np.dtype): 距离矩阵的数据类型
+
+    Returns:
+        np.ndarray: 初始距离矩阵, 对角线为0, 边(u, v)处为权重, 其余为不可达
     """
-    # 初始化
     n = len(Graph)
-    dist = np.array([[float('inf') for i in range(n)] for j in range(n)])
-    for i in range(n):
-        dist[i][i] = 0
-    for edge in Graph.edges():
-        if isinstance(Graph, nx.DiGraph):
-            dist[edge[0]][edge[1]] = Graph[edge[0]][edge[1]]['weight']
-        else:
-            dist[edge[0]][edge[1]] = Graph[edge[0]][edge[1]]['weight']
-            dist[edge[1]][edge[0]] = Graph[edge[0]][edge[1]]['weight']
-    # Floyd算法
-    for k in range(n):
-        for i in range(n):
-            for j in range(n):
-                if dist[i][j] > dist[i][k] + dist[k][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
+    dist = np.full((n, n), _infValue(dtype), dtype=dtype)
+    np.fill_diagonal(dist, 0)
+    src, dst, weight = _edgeArray(Graph)
+    if np.issubdtype(dist.dtype, np.integer) and not np.array_equal(weight, np.round(weight)):
+        raise ValueError("Integer dtype requires integer edge weights")
+    dist[src, dst] = weight
+    if not _isDirected(Graph):
+        dist[dst, src] = weight
     return dist
 
+def _initNextHop(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], n : int = None) -> np.ndarray:
+    """构造初始next-hop矩阵, 边(u, v)处为v, 对角线为自身, 其余为-1
 
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图
+        n (int, optional): 矩阵边长, 不小于图的点数. Defaults to None, 即图的点数.
 
-def Floyd2(Graph : nx.Graph) -> np.ndarray:
-    """返回最短路矩阵, 使用Floyd算法, 专用于无向图
+    Returns:
+        np.ndarray: 初始next-hop矩阵
+    """
+    n = len(Graph) if n is None else n
+    nextHop = np.full((n, n), -1, dtype=nextHopDtype(n))
+    np.fill_diagonal(nextHop, np.arange(n))
+    src, dst, _ = _edgeArray(Graph)
+    nextHop[src, dst] = dst
+    if not _isDirected(Graph):
+        nextHop[dst, src] = src
+    return nextHop
+
+def _floydWarshallPath(dist : np.ndarray, nextHop : np.ndarray) -> tuple:
+    """原地执行Floyd算法并同步更新next-hop矩阵, dist可以是(n, n)矩阵或(B, n, n)张量
+
+    Args:
+        dist (np.ndarray): 初始距离矩阵
+        nextHop (np.ndarray): 与dist形状相同的初始next-hop矩阵
+
+    Returns:
+        tuple: (dist, nextHop)
+    """
+    if np.issubdtype(dist.dtype, np.integer):
+        if dist.ndim == 3:
+            for b in range(dist.shape[0]):
+                _floydWarshallPath(dist[b], nextHop[b])
+            return dist, nextHop
+        # 同_minPlusInto, 只在两段都可达的子块上松弛
+        inf = np.iinfo(dist.dtype).max
+        for k in range(dist.shape[0]):
+            rows = np.flatnonzero(dist[:, k] != inf)
+            cols = np.flatnonzero(dist[k, :] != inf)
+            if rows.size == 0 or cols.size == 0:
+                continue
+            block = np.ix_(rows, cols)
+            candidate = dist[rows, k][:, None] + dist[k, cols][None, :]
+            improved = candidate < dist[block]
+            dist[block] = np.where(improved, candidate, dist[block])
+            nextHop[block] = np.where(improved, nextHop[rows, k][:, None], nextHop[block])
+        return dist, nextHop
+    for k in range(dist.shape[-1]):
+        candidate = dist[..., :, k, None] + dist[..., None, k, :]
+        improved = candidate < dist
+        np.copyto(dist, candidate, where=improved)
+        np.copyto(nextHop, np.broadcast_to(nextHop[..., :, k, None].copy(), nextHop.shape), where=improved)
+    return dist, nextHop
+
+def _cachedAPSP(cache : DistanceCache, Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], dtype : np.dtype, algorithm : str,
+                stats : SearchStats, compute : callable) -> np.ndarray:
+    """先在cache中查询Graph的最短路矩阵, 未命中时调用compute()计算并以algorithm的当前版本写入
 
     Args:
-        Graph (Graph): networkx.Graph表示的图
+        cache (DistanceCache): 最短路矩阵缓存
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图
+        dtype (np.dtype): 距离矩阵的数据类型, 是缓存键的一部分
+        algorithm (str): APSP_VERSIONS中的算法名
+        stats (SearchStats): 运行统计, 可为None
+        compute (callable): 无参数, 返回最短路矩阵
 
     Returns:
         np.ndarray: 最短路矩阵
     """
-    # 初始化
-    n = len(Graph)
-    dist = np.array([[float('inf') for i in range(n)] for j in range(n)])
-    for i in range(n):
-        dist[i][i] = 0
-    for edge in Graph.edges():
-        dist[edge[0]][edge[1]] = Graph[edge[0]][edge[1]]['weight']
-        dist[edge[1]][edge[0]] = Graph[edge[0]][edge[1]]['weight']
-    # Floyd算法，结果为对称矩阵因此每次只计算上三角矩阵
+    with phaseTimer(stats, 'cache'):
+        key = _graphKey(Graph, dtype)
+        dist = cache.get(key, APSP_VERSIONS)
+    if dist is not None:
+        if stats is not None:
+            stats.add(calls=1)
+        return dist
+    dist = compute()
+    cache.put(key, dist, algorithm, APSP_VERSIONS[algorithm])
+    return dist
+
+def _graphKey(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], dtype : np.dtype) -> str:
+    """返回图在DistanceCache中的规范哈希键"""
+    src, dst, weight = _edgeArray(Graph)
+    return DistanceCache.key(len(Graph), src, dst, weight, _isDirected(Graph), dtype)
+
+def _floydWarshall(dist: np.ndarray) -> np.ndarray:
+    """原地执行Floyd算法, 每个中间点k以广播方式整行整列松弛
+
+    Args:
+        dist (np.ndarray): 初始距离矩阵
+
+    Returns:
+        np.ndarray: 最短路矩阵(即dist本身)
+    """
+    # 整数类型没有inf, 由_minPlusInto只在两段都可达的行列子矩阵上松弛, 避免哨兵值溢出
+    return _minPlusInto(dist, dist, dist)
+
+def Floyd(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], dtype: np.dtype = np.float64, stats : SearchStats = None,
+          cache : DistanceCache = None, returnPath : bool = False) -> np.ndarray:
+    """返回最短路矩阵, 使用Floyd算法
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        dtype (np.dtype, optional): 距离矩阵的数据类型, 支持float64/float32/int64/int32. Defaults to np.float64.
+            整数类型下不可达用np.iinfo(dtype).max表示
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        cache (DistanceCache, optional): 最短路矩阵缓存, 给定时先按图内容查询, 未命中再计算并写入. Defaults to None.
+        returnPath (bool, optional): 是否同时返回next-hop矩阵, nextHop[i, j]为i到j最短路上i的下一个点, 不可达为-1,
+            点数少于32768时为int16, 否则为int32, 可用codes.path.iterNextHop还原路径; 不能与cache同时使用. Defaults to False.
+
+    Returns:
+        Union[np.ndarray, tuple]: 最短路矩阵, returnPath为True时为(最短路矩阵, next-hop矩阵)
+    """
+    if cache is not None:
+        if returnPath:
+            raise ValueError("cache does not store next-hop matrices")
+        return _cachedAPSP(cache, Graph, dtype, 'Floyd', stats, lambda: Floyd(Graph, dtype, stats))
+    with phaseTimer(stats, 'build'):
+        dist = _initDistMatrix(Graph, dtype)
+        nextHop = _initNextHop(Graph) if returnPath else None
+    with phaseTimer(stats, 'solve'):
+        if returnPath:
+            _floydWarshallPath(dist, nextHop)
+        else:
+            _floydWarshall(dist)
+    if stats is not None:
+        stats.add(calls=1, relaxAttempts=dist.shape[0] ** 3)
+    return (dist, nextHop) if returnPath else dist
+
+
+
+def Floyd2(Graph : Union[nx.Graph, CompactGraph], dtype: np.dtype = np.float64, stats : SearchStats = None,
+           cache : DistanceCache = None, packed : bool = False, returnPath : bool = False) -> Union[np.ndarray, PackedSymmetricMatrix]:
+    """返回最短路矩阵, 使用Floyd算法, 专用于无向图
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / 无向CompactGraph 表示的图
+        dtype (np.dtype, optional): 距离矩阵的数据类型, 同Floyd. Defaults to np.float64.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        cache (DistanceCache, optional): 最短路矩阵缓存, 给定时先按图内容查询, 未命中再计算并写入. Defaults to None.
+        packed (bool, optional): 是否只存储上三角, 在压缩布局上直接执行对称松弛, 内存约减半;
+            只支持浮点dtype, 不能与cache、returnPath同时使用. Defaults to False.
+        returnPath (bool, optional): 是否同时返回next-hop矩阵, 同Floyd. Defaults to False.
+
+    Returns:
+        Union[np.ndarray, PackedSymmetricMatrix, tuple]: 最短路矩阵, packed为True时为PackedSymmetricMatrix,
+            returnPath为True时为(最短路矩阵, next-hop矩阵)
+    """
+    if not packed:
+        # 无向图的初始矩阵对称, 整行整列松弛后结果仍为对称矩阵
+        return Floyd(Graph, dtype, stats, cache, returnPath)
+    if returnPath:
+        raise ValueError("Packed storage does not support returnPath")
+    if _isDirected(Graph):
+        raise ValueError("Packed storage requires an undirected graph")
+    if cache is not None:
+        raise ValueError("Packed storage does not support cache")
+    with phaseTimer(stats, 'build'):
+        n = len(Graph)
+        dist = PackedSymmetricMatrix(n, dtype)
+        src, dst, weight = _edgeArray(Graph)
+        dist[src, dst] = weight
+    with phaseTimer(stats, 'solve'):
+        dist.floydWarshall()
+    if stats is not None:
+        stats.add(calls=1, relaxAttempts=n * n * (n + 1) // 2)
+    return dist
+
+def FloydBatch(graphList : list, dtype: np.dtype = np.float64, bucketSize : int = 8, stats : SearchStats = None,
+               cache : DistanceCache = None, returnPath : bool = False) -> list:
+    """批量返回多个图的最短路矩阵, 将图补齐到相同点数后在(B, n, n)张量上同时执行Floyd算法
+
+    按点数向上取整到bucketSize的倍数分桶, 同一桶内的图补齐到桶内最大点数, 补齐的点不与任何点相连, 不影响结果
+
+    Args:
+        graphList (list): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图的列表
+        dtype (np.dtype, optional): 距离矩阵的数据类型, 同Floyd. Defaults to np.float64.
+        bucketSize (int, optional): 分桶粒度. Defaults to 8.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        cache (DistanceCache, optional): 最短路矩阵缓存, 给定时只对未命中的图批量计算. Defaults to None.
+        returnPath (bool, optional): 是否同时返回next-hop矩阵, 同Floyd. Defaults to False.
+
+    Returns:
+        list: 与graphList一一对应的最短路矩阵, 每个矩阵均裁剪回该图的点数; returnPath为True时每一项为(最短路矩阵, next-hop矩阵)
+    """
+    if cache is not None and returnPath:
+        raise ValueError("cache does not store next-hop matrices")
+    if cache is not None:
+        with phaseTimer(stats, 'cache'):
+            keys = [_graphKey(Graph, dtype) for Graph in graphList]
+            results = [cache.get(key, APSP_VERSIONS) for key in keys]
+        missing = [index for index, dist in enumerate(results) if dist is None]
+        if missing:
+            for index, dist in zip(missing, FloydBatch([graphList[index] for index in missing], dtype, bucketSize, stats)):
+                cache.put(keys[index], dist, 'FloydBatch', APSP_VERSIONS['FloydBatch'])
+                results[index] = dist
+        elif stats is not None:
+            stats.add(calls=1)
+        return results
+    buckets = {}
+    for index, Graph in enumerate(graphList):
+        buckets.setdefault(-(-len(Graph) // bucketSize), []).append(index)
+    results = [None] * len(graphList)
+    for indices in buckets.values():
+        n = max(len(graphList[index]) for index in indices)
+        with phaseTimer(stats, 'build'):
+            dist = np.full((len(indices), n, n), _infValue(dtype), dtype=dtype)
+            dist[:, np.arange(n), np.arange(n)] = 0
+            for b, index in enumerate(indices):
+                m = len(graphList[index])
+                dist[b, :m, :m] = _initDistMatrix(graphList[index], dtype)
+            if returnPath:
+                nextHop = np.stack([_initNextHop(graphList[index], n) for index in indices])
+        with phaseTimer(stats, 'solve'):
+            if returnPath:
+                _floydWarshallPath(dist, nextHop)
+            else:
+                _floydWarshallBatch(dist)
+        with phaseTimer(stats, 'convert'):
+            for b, index in enumerate(indices):
+                m = len(graphList[index])
+                results[index] = dist[b, :m, :m].copy()
+                if returnPath:
+                    results[index] = (results[index], nextHop[b, :m, :m].astype(nextHopDtype(m)))
+        if stats is not None:
+            stats.add(relaxAttempts=len(indices) * n ** 3)
+    if stats is not None:
+        stats.add(calls=1)
+    return results
+
+def _floydWarshallBatch(dist: np.ndarray) -> np.ndarray:
+    """原地对(B, n, n)张量中的每个距离矩阵同时执行Floyd算法
+
+    Args:
+        dist (np.ndarray): 初始距离矩阵堆叠成的张量
+
+    Returns:
+        np.ndarray: 最短路矩阵张量(即dist本身)
+    """
+    if np.issubdtype(dist.dtype, np.integer):
+        # 整数类型逐个矩阵处理, 以复用只在可达子矩阵上松弛的逻辑
+        for matrix in dist:
+            _floydWarshall(matrix)
+        return dist
+    n = dist.shape[1]
     for k in range(n):
-        for i in range(n):
-            for j in range(i, n):
-                if dist[i][j] > dist[i][k] + dist[k][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
-                    dist[j][i] = dist[i][k] + dist[k][j]
+        np.minimum(dist, dist[:, :, k, None] + dist[:, None, k, :], out=dist)
     return dist
 
-def Dijsktra(Graph : nx.Graph, start : int):
-    # 初始化
+def FloydBlocked(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], path : str = None, dtype: np.dtype = np.float64,
+                 blockSize : int = None, memoryBudget : int = FLOYD_BLOCK_MEMORY, workers : int = None,
+                 stats : SearchStats = None) -> np.memmap:
+    """返回存储在磁盘上的最短路矩阵, 使用分块Floyd算法, 适用于内存放不下n*n矩阵的大图
+
+    矩阵以np.memmap存储, 每个中间块kb按三阶段调度: 1. 对角块自身执行Floyd; 2. 与kb同行/同列的块以对角块松弛;
+    3. 其余块以(i, kb)与(kb, j)块做min-plus乘积松弛. 阶段2、3中的块互不依赖, 由线程池并行处理(NumPy运算释放GIL)
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        path (str, optional): 矩阵文件路径, 已存在时覆盖. Defaults to None, 即使用临时文件, 映射后立即删除文件名.
+        dtype (np.dtype, optional): 距离矩阵的数据类型, 同Floyd. Defaults to np.float64.
+        blockSize (int, optional): 分块边长. Defaults to None, 即按memoryBudget与workers确定.
+        memoryBudget (int, optional): 所有线程同时驻留的分块总大小上限(字节), 每个线程至多驻留4个分块. Defaults to FLOYD_BLOCK_MEMORY.
+        workers (int, optional): 线程数. Defaults to None, 即CPU核数.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+
+    Returns:
+        np.memmap: 最短路矩阵, 与Floyd的结果相同
+    """
     n = len(Graph)
-    dist = np.array([float('inf') for i in range(n)])
+    dtype = np.dtype(dtype)
+    inf = _infValue(dtype)
+    workers = os.cpu_count() if workers is None else workers
+    if blockSize is None:
+        blockSize = int((memoryBudget / (4 * workers * dtype.itemsize)) ** 0.5)
+    blockSize = max(1, min(blockSize, n))
+    bounds = [(begin, min(begin + blockSize, n)) for begin in range(0, n, blockSize)]
+
+    with phaseTimer(stats, 'build'):
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.dist')
+            os.close(fd)
+            dist = np.memmap(path, dtype=dtype, mode='w+', shape=(n, n))
+            os.remove(path)
+        else:
+            dist = np.memmap(path, dtype=dtype, mode='w+', shape=(n, n))
+        src, dst, weight = _edgeArray(Graph)
+        if np.issubdtype(dtype, np.integer) and not np.array_equal(weight, np.round(weight)):
+            raise ValueError("Integer dtype requires integer edge weights")
+        if not _isDirected(Graph):
+            src, dst, weight = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([weight, weight])
+        order = np.argsort(src, kind='stable')
+        src, dst, weight = src[order], dst[order], weight[order]
+        # 按行初始化, 每次驻留的行不超过memoryBudget
+        chunk = max(1, memoryBudget // max(n * dtype.itemsize, 1))
+        for begin in range(0, n, chunk):
+            end = min(begin + chunk, n)
+            rows = np.full((end - begin, n), inf, dtype=dtype)
+            rows[np.arange(end - begin), np.arange(begin, end)] = 0
+            lo, hi = np.searchsorted(src, [begin, end])
+            rows[src[lo:hi] - begin, dst[lo:hi]] = weight[lo:hi]
+            dist[begin:end] = rows
+
+    def relaxPanel(i, j, kBegin, kEnd, diagonal):
+        # 阶段2: 与对角块同行(i为对角块)或同列(j为对角块)的块
+        block = np.array(dist[i[0]:i[1], j[0]:j[1]])
+        if i == (kBegin, kEnd):
+            _minPlusInto(block, diagonal, block)
+        else:
+            _minPlusInto(block, block, diagonal)
+        dist[i[0]:i[1], j[0]:j[1]] = block
+
+    def relaxTile(i, j, kBegin, kEnd):
+        # 阶段3: 经过中间块的路径为(i, kb)块与(kb, j)块的min-plus乘积
+        block = np.array(dist[i[0]:i[1], j[0]:j[1]])
+        _minPlusInto(block, np.array(dist[i[0]:i[1], kBegin:kEnd]), np.array(dist[kBegin:kEnd, j[0]:j[1]]))
+        dist[i[0]:i[1], j[0]:j[1]] = block
+
+    with phaseTimer(stats, 'solve'), ThreadPoolExecutor(max(workers, 1)) as executor:
+        for kBegin, kEnd in bounds:
+            diagonal = np.array(dist[kBegin:kEnd, kBegin:kEnd])
+            _minPlusInto(diagonal, diagonal, diagonal)
+            dist[kBegin:kEnd, kBegin:kEnd] = diagonal
+            others = [bound for bound in bounds if bound != (kBegin, kEnd)]
+            panels = [((kBegin, kEnd), j) for j in others] + [(i, (kBegin, kEnd)) for i in others]
+            list(executor.map(lambda pair: relaxPanel(*pair, kBegin, kEnd, diagonal), panels))
+            tiles = [(i, j) for i in others for j in others]
+            list(executor.map(lambda pair: relaxTile(*pair, kBegin, kEnd), tiles))
+        dist.flush()
+    if stats is not None:
+        stats.add(calls=1, relaxAttempts=n ** 3)
+    return dist
+
+def _minPlusInto(C : np.ndarray, A : np.ndarray, B : np.ndarray) -> np.ndarray:
+    """原地计算C = min(C, A ⊗ B), ⊗为min-plus乘积, 依次以A的第k列与B的第k行松弛
+
+    A或B可以就是C本身, 此时即为在C上原地执行Floyd算法的一步; 整数类型只在两段都可达的子块上松弛, 避免哨兵值溢出
+
+    Args:
+        C (np.ndarray): (p, q)矩阵
+        A (np.ndarray): (p, b)矩阵
+        B (np.ndarray): (b, q)矩阵
+
+    Returns:
+        np.ndarray: C本身
+    """
+    if np.issubdtype(C.dtype, np.integer):
+        inf = np.iinfo(C.dtype).max
+        for k in range(A.shape[1]):
+            rows = np.flatnonzero(A[:, k] != inf)
+            cols = np.flatnonzero(B[k, :] != inf)
+            if rows.size == 0 or cols.size == 0:
+                continue
+            block = np.ix_(rows, cols)
+            C[block] = np.minimum(C[block], A[rows, k][:, None] + B[k, cols][None, :])
+    else:
+        for k in range(A.shape[1]):
+            np.minimum(C, A[:, k, None] + B[None, k, :], out=C)
+    return C
+
+def Dijsktra(Graph : Union[nx.Graph, CompactGraph], start : int, target : int = None, heap : str = 'binary', stats : SearchStats = None,
+             returnPath : bool = False) -> np.ndarray:
+    """返回单源最短路数组, 使用堆优化的Dijkstra算法, 要求边权重非负
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        start (int): 起点
+        target (int, optional): 终点, 给定时终点出堆即停止, 此时只有已出堆点的距离是最终值. Defaults to None.
+        heap (str, optional): 优先队列, 'binary'为懒删除的二叉堆, 'pairing'为支持decrease-key的配对堆,
+            'dial'/'radix'为整数权重专用的桶队列/基数堆(见Dial), 'auto'在权重为不超过DIAL_MAX_WEIGHT的非负整数时使用'dial', 否则使用'binary'. Defaults to 'binary'.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        returnPath (bool, optional): 是否同时返回前驱数组, 起点与不可达的点为-1, 类型同Floyd的next-hop矩阵,
+            可用codes.path.reconstructPath还原路径. Defaults to False.
+
+    Returns:
+        Union[np.ndarray, tuple]: start到各点的最短路长度, 不可达为inf; returnPath为True时为(最短路长度, 前驱数组)
+    """
+    # 初始化
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    if Graph.weights.size > 0 and Graph.weights.min() < 0:
+        raise ValueError("Dijkstra requires non-negative edge weights")
+    if heap == 'auto':
+        maxWeight = Graph.maxIntegerWeight
+        heap = 'dial' if maxWeight is not None and maxWeight <= DIAL_MAX_WEIGHT else 'binary'
+    if heap in ('dial', 'radix'):
+        result = Dial(Graph, start, target, queue='bucket' if heap == 'dial' else 'radix', stats=stats, returnPath=returnPath)
+        dist = result[0] if returnPath else result
+        with phaseTimer(stats, 'convert'):
+            dist = np.where(dist == np.iinfo(dist.dtype).max, np.inf, dist)
+        return (dist, result[1]) if returnPath else dist
+    with phaseTimer(stats, 'solve'):
+        if heap == 'binary':
+            dist, pred, counters = _dijkstraBinaryHeap(Graph, start, target)
+        elif heap == 'pairing':
+            dist, pred, counters = _dijkstraPairingHeap(Graph, start, target)
+        else:
+            raise ValueError(f"Invalid heap type: {heap}")
+    with phaseTimer(stats, 'convert'):
+        dist = np.array(dist)
+    if stats is not None:
+        stats.add(calls=1, **counters)
+    return (dist, np.array(pred, dtype=nextHopDtype(Graph.n))) if returnPath else dist
+
+def _dijkstraBinaryHeap(Graph : CompactGraph, start : int, target : int) -> tuple:
+    """二叉堆Dijkstra, 松弛时直接压入新元素, 出堆时跳过过期元素, 返回(dist, 前驱, 计数器)"""
+    n = Graph.n
+    indptr = Graph.indptr.tolist()
+    indices = Graph.indices
+    weights = Graph.weights
+    dist = [float('inf')] * n
+    dist[start] = 0.0
+    pred = [-1] * n
+    visited = [False] * n
+    queue = [(0.0, start)]
+    pushes = 1
+    settled = attempts = 0
+    while queue:
+        d, u = heapq.heappop(queue)
+        if visited[u]:
+            continue
+        visited[u] = True
+        settled += 1
+        if u == target:
+            break
+        begin, end = indptr[u], indptr[u + 1]
+        attempts += end - begin
+        for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+            if d + weight < dist[v]:
+                dist[v] = d + weight
+                pred[v] = u
+                heapq.heappush(queue, (dist[v], v))
+                pushes += 1
+    return dist, pred, {'relaxAttempts': attempts, 'relaxSuccesses': pushes - 1, 'pushes': pushes,
+                  'pops': pushes - len(queue), 'settled': settled}
+
+def _dijkstraPairingHeap(Graph : CompactGraph, start : int, target : int) -> tuple:
+    """配对堆Dijkstra, 每个点在堆中至多一个节点, 松弛时decrease-key, 返回(dist, 前驱, 计数器)"""
+    n = Graph.n
+    indptr = Graph.indptr.tolist()
+    indices = Graph.indices
+    weights = Graph.weights
+    dist = [float('inf')] * n
+    dist[start] = 0.0
+    pred = [-1] * n
+    visited = [False] * n
+    nodes = [None] * n
+    queue = PairingHeap()
+    nodes[start] = queue.push(0.0, start)
+    pushes = 1
+    settled = attempts = successes = 0
+    while queue:
+        d, u = queue.pop()
+        visited[u] = True
+        settled += 1
+        if u == target:
+            break
+        begin, end = indptr[u], indptr[u + 1]
+        attempts += end - begin
+        for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+            if not visited[v] and d + weight < dist[v]:
+                dist[v] = d + weight
+                pred[v] = u
+                successes += 1
+                if nodes[v] is None:
+                    nodes[v] = queue.push(dist[v], v)
+                    pushes += 1
+                else:
+                    queue.decreaseKey(nodes[v], dist[v])
+    return dist, pred, {'relaxAttempts': attempts, 'relaxSuccesses': successes, 'pushes': pushes,
+                  'pops': settled, 'settled': settled}
+
+def Dial(Graph : Union[nx.Graph, CompactGraph], start : int, target : int = None, queue : str = 'bucket', stats : SearchStats = None,
+         returnPath : bool = False) -> np.ndarray:
+    """返回单源最短路数组, 专用于非负整数边权重, 距离全程以整数计算
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图, 边权重为非负整数
+        start (int): 起点
+        target (int, optional): 终点, 含义同Dijsktra. Defaults to None.
+        queue (str, optional): 'bucket'为max_w + 1个循环桶的Dial桶队列, 'radix'为基数堆. Defaults to 'bucket'.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        returnPath (bool, optional): 是否同时返回前驱数组, 同Dijsktra. Defaults to False.
+
+    Returns:
+        Union[np.ndarray, tuple]: start到各点的最短路长度, 最长可能路径不超过int32范围时为int32数组, 否则为int64数组,
+            不可达为np.iinfo(dtype).max; returnPath为True时为(最短路长度, 前驱数组)
+    """
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    maxWeight = Graph.maxIntegerWeight
+    if maxWeight is None:
+        raise ValueError("Dial requires non-negative integer edge weights")
+    dtype = np.int32 if max(Graph.n - 1, 0) * maxWeight < np.iinfo(np.int32).max else np.int64
+    with phaseTimer(stats, 'solve'):
+        if queue == 'bucket':
+            dist, pred, counters = _dialBucketQueue(Graph, start, target, maxWeight)
+        elif queue == 'radix':
+            dist, pred, counters = _dialRadixHeap(Graph, start, target)
+        else:
+            raise ValueError(f"Invalid queue type: {queue}")
+    with phaseTimer(stats, 'convert'):
+        inf = np.iinfo(dtype).max
+        dist = np.array([inf if d is None else d for d in dist], dtype=dtype)
+    if stats is not None:
+        stats.add(calls=1, **counters)
+    return (dist, np.array(pred, dtype=nextHopDtype(Graph.n))) if returnPath else dist
+
+def _dialBucketQueue(Graph : CompactGraph, start : int, target : int, maxWeight : int) -> tuple:
+    """Dial算法, 距离d的点放入第d % (maxWeight + 1)个桶, 按距离递增依次清空各桶, 返回(dist, 前驱, 计数器)"""
+    n = Graph.n
+    indptr = Graph.indptr.tolist()
+    indices = Graph.indices
+    weights = Graph.weights.astype(np.int64)
+    size = maxWeight + 1
+    buckets = [[] for _ in range(size)]
+    dist = [None] * n
+    dist[start] = 0
+    pred = [-1] * n
+    visited = [False] * n
+    buckets[0].append(start)
+    pending = pushes = 1
+    settled = attempts = 0
+    d = 0
+    while pending > 0:
+        bucket = buckets[d % size]
+        while bucket:
+            u = bucket.pop()
+            pending -= 1
+            if visited[u] or dist[u] != d:
+                continue
+            visited[u] = True
+            settled += 1
+            if u == target:
+                pending = 0
+                break
+            begin, end = indptr[u], indptr[u + 1]
+            attempts += end - begin
+            for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+                if dist[v] is None or d + weight < dist[v]:
+                    dist[v] = d + weight
+                    pred[v] = u
+                    buckets[dist[v] % size].append(v)
+                    pending += 1
+                    pushes += 1
+        d += 1
+    return dist, pred, {'relaxAttempts': attempts, 'relaxSuccesses': pushes - 1, 'pushes': pushes,
+                  'pops': pushes - sum(len(bucket) for bucket in buckets), 'settled': settled}
+
+def _dialRadixHeap(Graph : CompactGraph, start : int, target : int) -> tuple:
+    """以基数堆为优先队列的整数Dijkstra, 返回(dist, 前驱, 计数器)"""
+    n = Graph.n
+    indptr = Graph.indptr.tolist()
+    indices = Graph.indices
+    weights = Graph.weights.astype(np.int64)
+    dist = [None] * n
     dist[start] = 0
-    visited = [False for i in range(n)]
-    # Dijkstra算法
-    for i in range(n):
-        u = -1
-        for j in range(n):
-            if not visited[j] and (u == -1 or dist[j] < dist[u]):
-                u = j
+    pred = [-1] * n
+    visited = [False] * n
+    queue = RadixHeap()
+    queue.push(0, start)
+    pushes = 1
+    settled = attempts = 0
+    while queue:
+        d, u = queue.pop()
+        if visited[u]:
+            continue
         visited[u] = True
-        for v in range(n):
-            if not visited[v] and dist[u] + Graph[u][v]['weight'] < dist[v]:
-                dist[v] = dist[u] + Graph[u][v]['weight']
-    return dist
+        settled += 1
+        if u == target:
+            break
+        begin, end = indptr[u], indptr[u + 1]
+        attempts += end - begin
+        for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+            if dist[v] is None or d + weight < dist[v]:
+                dist[v] = d + weight
+                pred[v] = u
+                queue.push(dist[v], v)
+                pushes += 1
+    return dist, pred, {'relaxAttempts': attempts, 'relaxSuccesses': pushes - 1, 'pushes': pushes,
+                  'pops': pushes - len(queue), 'settled': settled}
+
+def BellmanFord(Graph : Union[nx.Graph, CompactGraph], start : int, stats : SearchStats = None,
+                returnPath : bool = False) -> np.ndarray:
+    """返回单源最短路数组, 使用Bellman-Ford算法
+
+    每一轮对全部边做一次向量化松弛, 某一轮没有距离变化时提前结束;
+    n-1轮后仍可松弛说明存在可达的负权重环, 此时从负权重环可达的点距离为-inf
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        start (int): 起点
+        stats (SearchStats, optional): 运行统计, 给定时累加计数与各阶段耗时. Defaults to None.
+        returnPath (bool, optional): 是否同时返回前驱数组, 同Dijsktra, 经过负权重环可达的点前驱为-1. Defaults to False.
 
-def BellmanFord(Graph : nx.Graph, start : int):
+    Returns:
+        Union[np.ndarray, tuple]: start到各点的最短路长度, 不可达为inf, 经过负权重环可达为-inf;
+            returnPath为True时为(最短路长度, 前驱数组)
+    """
     # 初始化
-    n = len(Graph)
-    dist = np.array([float('inf') for i in range(n)])
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    dist = np.full(Graph.n, np.inf)
     dist[start] = 0
+    pred = np.full(Graph.n, -1, dtype=nextHopDtype(Graph.n)) if returnPath else None
     # Bellman-Ford算法
-    for i in range(n):
-        for edge in Graph.edges():
-            if dist[edge[0]] + Graph[edge[0]][edge[1]]['weight'] < dist[edge[1]]:
-                dist[edge[1]] = dist[edge[0]] + Graph[edge[0]][edge[1]]['weight']
-    return dist
+    with phaseTimer(stats, 'solve'):
+        dist, unstable = _bellmanFordRelax(Graph, dist, stats, pred)
+        if unstable.any():
+            dist[_reachableFrom(Graph, unstable)] = -np.inf
+            if returnPath:
+                pred[np.isneginf(dist)] = -1
+    if stats is not None:
+        stats.add(calls=1)
+    return (dist, pred) if returnPath else dist
+
+def _bellmanFordRelax(Graph : CompactGraph, dist : np.ndarray, stats : SearchStats = None, pred : np.ndarray = None) -> tuple:
+    """对初始距离dist执行至多n-1轮向量化松弛, 再用第n轮检查是否仍可松弛
+
+    每一轮按入边(CSC)顺序计算dist[u] + w, 再用np.minimum.reduceat得到每个点的最小候选值
+
+    Args:
+        Graph (CompactGraph): 紧凑图
+        dist (np.ndarray): 初始距离数组, 会被原地修改
+        stats (SearchStats, optional): 运行统计, 给定时累加松弛轮数与松弛次数. Defaults to None.
+        pred (np.ndarray, optional): 前驱数组, 给定时原地记录每个点最近一次被松弛时所用入边的起点. Defaults to None.
+
+    Returns:
+        tuple: (dist, unstable), unstable为第n轮仍能被松弛的点的布尔数组, 全为False表示无可达负权重环
+    """
+    n = Graph.n
+    hasInEdges = np.diff(Graph.rindptr) > 0
+    targets = np.flatnonzero(hasInEdges)
+    segmentStarts = Graph.rindptr[:-1][hasInEdges]
+    if pred is not None:
+        segmentLengths = np.diff(Graph.rindptr)[hasInEdges]
+        positions = np.arange(len(Graph.rindices))
+    unstable = np.zeros(n, dtype=bool)
+    passes = successes = 0
+    if targets.size > 0:
+        for passes in range(1, n + 1):
+            values = dist[Graph.rindices] + Graph.rweights
+            candidate = np.minimum.reduceat(values, segmentStarts)
+            improved = candidate < dist[targets]
+            if not improved.any():
+                break
+            if passes == n:
+                unstable[targets[improved]] = True
+                break
+            dist[targets[improved]] = candidate[improved]
+            successes += int(np.count_nonzero(improved))
+            if pred is not None:
+                # 每段中第一条取到最小值的入边即为所用的边
+                first = np.minimum.reduceat(np.where(values == np.repeat(candidate, segmentLengths), positions, len(positions)), segmentStarts)
+                pred[targets[improved]] = Graph.rindices[first[improved]]
+    if stats is not None:
+        stats.add(passes=passes, relaxAttempts=passes * len(Graph.rindices), relaxSuccesses=successes)
+    return dist, unstable
 
-def BellmanFoldSPFA(Graph : nx.Graph, start : int):
+def _reachableFrom(Graph : CompactGraph, sources : np.ndarray) -> np.ndarray:
+    """返回从sources(布尔数组)出发可达的所有点(布尔数组, 含sources本身)"""
+    src, dst, _ = Graph.arcs()
+    reached = sources.copy()
+    while True:
+        frontier = dst[reached[src] & ~reached[dst]]
+        if frontier.size == 0:
+            return reached
+        reached[frontier] = True
+
+def BellmanFoldSPFA(Graph : Union[nx.Graph, CompactGraph], start : int, slf : bool = False, lll : bool = False, stats : SearchStats = None,
+                    returnPath : bool = False) -> np.ndarray:
+    """返回单源最短路数组, 使用SPFA(队列优化的Bellman-Ford)算法
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        start (int): 起点
+        slf (bool, optional): Small-Label-First, 入队点的距离小于队首时插入队首. Defaults to False.
+        lll (bool, optional): Large-Label-Last, 队首距离大于队列平均距离时移至队尾. Defaults to False.
+        stats (SearchStats, optional): 运行统计, 给定时累加计数、每个点的入队次数与各阶段耗时. Defaults to None.
+        returnPath (bool, optional): 是否同时返回前驱数组, 同Dijsktra. Defaults to False.
+
+    Raises:
+        NegativeCycleError: 从start可达负权重环. 某点当前最短路的边数达到n时判定, 异常中附带该负权重环
+
+    Returns:
+        Union[np.ndarray, tuple]: start到各点的最短路长度, 不可达为inf; returnPath为True时为(最短路长度, 前驱数组)
+    """
     # 初始化
-    n = len(Graph)
-    dist = np.array([float('inf') for i in range(n)])
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    n = Graph.n
+    indptr = Graph.indptr.tolist()
+    indices = Graph.indices
+    weights = Graph.weights
+    dist = [float('inf')] * n
     dist[start] = 0
+    pred = [-1] * n
+    # 当前最短路的边数, 无负权重环时不超过n-1
+    length = [0] * n
     inQueue = [False for i in range(n)]
     inQueue[start] = True
-    queue = [start]
+    queue = deque([start])
+    queueSum = 0.0
+    enqueues = [0] * n
+    enqueues[start] = 1
+    attempts = successes = pops = 0
     # Bellman-Fold算法
-    while len(queue) > 0:
-        u = queue.pop(0)
-        inQueue[u] = False
-        for v in range(n):
-            if dist[u] + Graph[u][v]['weight'] < dist[v]:
-                dist[v] = dist[u] + Graph[u][v]['weight']
-                if not inQueue[v]:
-                    queue.append(v)
-                    inQueue[v] = True
+    with phaseTimer(stats, 'solve'):
+        while queue:
+            if lll:
+                average = queueSum / len(queue)
+                for _ in range(len(queue) - 1):
+                    if dist[queue[0]] <= average:
+                        break
+                    queue.append(queue.popleft())
+            u = queue.popleft()
+            pops += 1
+            inQueue[u] = False
+            queueSum -= dist[u]
+            begin, end = indptr[u], indptr[u + 1]
+            attempts += end - begin
+            for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+                if dist[u] + weight < dist[v]:
+                    successes += 1
+                    if inQueue[v]:
+                        queueSum += dist[u] + weight - dist[v]
+                    dist[v] = dist[u] + weight
+                    pred[v] = u
+                    length[v] = length[u] + 1
+                    if length[v] >= n:
+                        _spfaStats(stats, attempts, successes, enqueues, pops)
+                        raise NegativeCycleError(_findCycle(pred, v))
+                    if not inQueue[v]:
+                        if slf and queue and dist[v] < dist[queue[0]]:
+                            queue.appendleft(v)
+                        else:
+                            queue.append(v)
+                        inQueue[v] = True
+                        enqueues[v] += 1
+                        queueSum += dist[v]
+    _spfaStats(stats, attempts, successes, enqueues, pops)
+    return (np.array(dist), np.array(pred, dtype=nextHopDtype(n))) if returnPath else np.array(dist)
+
+def _spfaStats(stats : SearchStats, attempts : int, successes : int, enqueues : list, pops : int) -> None:
+    """将SPFA的局部计数写入stats, stats为None时不做任何事"""
+    if stats is None:
+        return
+    stats.add(calls=1, relaxAttempts=attempts, relaxSuccesses=successes, pushes=sum(enqueues), pops=pops)
+    stats.addEnqueues(enqueues)
+
+def _findCycle(pred : list, v : int) -> list:
+    """在前驱图中找环, 优先沿v的前驱链查找; 前驱图中的环必为负权重环
+
+    Args:
+        pred (list): 前驱数组, 无前驱为-1
+        v (int): 最先发现负权重环的点
+
+    Returns:
+        list: 环上的点, 按边的方向排列, 前驱图中无环时为空列表
+    """
+    n = len(pred)
+    state = [0] * n
+    for begin in [v] + list(range(n)):
+        if state[begin] != 0:
+            continue
+        # state: 0未访问, 1在当前前驱链上, 2已确认不在环上
+        u = begin
+        while u != -1 and state[u] == 0:
+            state[u] = 1
+            u = pred[u]
+        if u != -1 and state[u] == 1:
+            cycle = [u]
+            w = pred[u]
+            while w != u:
+                cycle.append(w)
+                w = pred[w]
+            cycle.reverse()
+            return cycle
+        u = begin
+        while u != -1 and state[u] == 1:
+            state[u] = 2
+            u = pred[u]
+    return []
+
+def Johnson(Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], workers : int = None, stats : SearchStats = None,
+            cache : DistanceCache = None) -> np.ndarray:
+    """返回最短路矩阵, 使用Johnson算法, 适用于含负权重边的稀疏图
+
+    先以一次Bellman-Ford求出势函数h并把边权重改写为w + h[u] - h[v] >= 0, 再对每个源点执行Dijkstra;
+    弧数超过JOHNSON_DENSE_RATIO * n^2时直接使用Floyd算法
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图
+        workers (int, optional): 执行Dijkstra的进程数, 为1或点数少于JOHNSON_PARALLEL_MIN_NODES时在当前进程执行. Defaults to None, 即CPU核数.
+        stats (SearchStats, optional): 运行统计, 给定时累加势函数的松弛计数与各阶段耗时; 多进程执行的Dijkstra不计数. Defaults to None.
+        cache (DistanceCache, optional): 最短路矩阵缓存, 给定时先按图内容查询, 未命中再计算并写入. Defaults to None.
+
+    Raises:
+        NegativeCycleError: 图中存在负权重环
+
+    Returns:
+        np.ndarray: 最短路矩阵
+    """
+    if cache is not None:
+        return _cachedAPSP(cache, Graph, np.float64, 'Johnson', stats, lambda: Johnson(Graph, workers, stats))
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    n = Graph.n
+    if len(Graph.indices) > JOHNSON_DENSE_RATIO * n * n:
+        dist = Floyd(Graph, stats=stats)
+        if (np.diag(dist) < 0).any():
+            _raiseNegativeCycle(Graph)
+        return dist
+
+    # 势函数: 等价于从一个到所有点边权重为0的虚拟源点出发的Bellman-Ford
+    with phaseTimer(stats, 'potential'):
+        potential, unstable = _bellmanFordRelax(Graph, np.zeros(n), stats)
+    if unstable.any():
+        _raiseNegativeCycle(Graph)
+    src, dst, weight = Graph.arcs()
+    reweighted = CompactGraph(n, src, dst, np.maximum(weight + potential[src] - potential[dst], 0), directed=True)
+
+    workers = os.cpu_count() if workers is None else workers
+    with phaseTimer(stats, 'solve'):
+        if workers <= 1 or n < JOHNSON_PARALLEL_MIN_NODES:
+            dist = np.empty((n, n))
+            for s in range(n):
+                dist[s], _, counters = _dijkstraBinaryHeap(reweighted, s, None)
+                if stats is not None:
+                    stats.add(**counters)
+        else:
+            dist = _johnsonParallel(reweighted, workers)
+    # 还原为原边权重下的距离, inf保持不变
+    with phaseTimer(stats, 'convert'):
+        dist += potential[None, :] - potential[:, None]
+    if stats is not None:
+        stats.add(calls=1)
     return dist
+
+def _raiseNegativeCycle(Graph : CompactGraph) -> None:
+    """已知Graph含负权重环时, 构造带虚拟源点的图, 用SPFA找出负权重环并抛出NegativeCycleError"""
+    n = Graph.n
+    virtual = np.full(n, n, dtype=np.int32)
+    src, dst, weight = Graph.arcs()
+    augmented = CompactGraph(n + 1, np.concatenate([src, virtual]), np.concatenate([dst, np.arange(n, dtype=np.int32)]),
+                             np.concatenate([weight, np.zeros(n)]), directed=True)
+    BellmanFoldSPFA(augmented, n)  # 必然抛出带负权重环的NegativeCycleError
+    raise NegativeCycleError([])
+
+def _johnsonParallel(Graph : CompactGraph, workers : int) -> np.ndarray:
+    """在进程池中对所有源点执行Dijkstra, 各进程把结果写入共享内存中的矩阵"""
+    n = Graph.n
+    sharedDist = shared_memory.SharedMemory(create=True, size=max(n * n * 8, 1))
+    try:
+        chunks = np.array_split(np.arange(n), workers * 4)
+        with ProcessPoolExecutor(workers, initializer=_johnsonWorkerInit, initargs=(Graph, sharedDist.name)) as executor:
+            list(executor.map(_johnsonWorker, [chunk.tolist() for chunk in chunks if chunk.size > 0]))
+        return np.ndarray((n, n), dtype=np.float64, buffer=sharedDist.buf).copy()
+    finally:
+        sharedDist.close()
+        sharedDist.unlink()
+
+_johnsonGraph = None
+_johnsonShared = None
+
+def _johnsonWorkerInit(Graph : CompactGraph, sharedName : str) -> None:
+    """进程池初始化: 保存改写权重后的图并挂载共享的结果矩阵"""
+    global _johnsonGraph, _johnsonShared
+    _johnsonGraph = Graph
+    _johnsonShared = shared_memory.SharedMemory(name=sharedName)
+
+def _johnsonWorker(sources : list) -> None:
+    """对一组源点执行Dijkstra, 结果直接写入共享矩阵的对应行"""
+    n = _johnsonGraph.n
+    dist = np.ndarray((n, n), dtype=np.float64, buffer=_johnsonShared.buf)
+    for s in sources:
+        dist[s] = _dijkstraBinaryHeap(_johnsonGraph, s, None)[0]
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# 缓存文件格式的版本, 改变键或文件布局时递增, 旧条目随之失效
+CACHE_FORMAT_VERSION = 1
+
+class DistanceCache:
+    """以图内容哈希为键、存储在磁盘上的最短路矩阵缓存
+
+    键由点数、是否有向、距离矩阵dtype以及按(src, dst)排序后的边数组与权重计算, 与节点/边的插入顺序无关;
+    每个条目保存为<key>.npy与记录算法名、算法版本的<key>.json, 按最近访问时间(文件mtime)做LRU淘汰
+
+    Attributes:
+        directory (str): 缓存目录
+        maxBytes (int): 缓存目录中.npy文件的总大小上限(字节)
+        hits (int): 命中次数
+        misses (int): 未命中次数
+    """
+
+    def __init__(self, directory: str = 'data/.distance_cache', maxBytes: int = 1 << 30) -> None:
+        """打开(必要时创建)缓存目录
+
+        Args:
+            directory (str, optional): 缓存目录. Defaults to 'data/.distance_cache'.
+            maxBytes (int, optional): 总大小上限(字节). Defaults to 1 << 30.
+        """
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(n: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray, directed: bool, dtype: np.dtype) -> str:
+        """计算图的规范哈希
+
+        Args:
+            n (int): 点数
+            src (np.ndarray): 边起点数组
+            dst (np.ndarray): 边终点数组
+            weight (np.ndarray): 边权重数组
+            directed (bool): 是否有向图, 无向图的每条边先规范为(min, max)
+            dtype (np.dtype): 距离矩阵的数据类型
+
+        Returns:
+            str: 十六进制sha256摘要
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        weight = np.asarray(weight, dtype=np.float64)
+        if not directed:
+            src, dst = np.minimum(src, dst), np.maximum(src, dst)
+        order = np.lexsort((weight, dst, src))
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_FORMAT_VERSION}:{n}:{int(directed)}:{np.dtype(dtype).str}:'.encode())
+        for array in (src[order], dst[order], weight[order]):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def _paths(self, key: str) -> tuple:
+        return os.path.join(self.directory, key + '.npy'), os.path.join(self.directory, key + '.json')
+
+    def get(self, key: str, versions: dict) -> np.ndarray:
+        """查询缓存, 命中时刷新条目的访问时间
+
+        Args:
+            key (str): key()的返回值
+            versions (dict): 算法名 -> 当前版本, 条目的算法不在其中或版本不一致时视为未命中
+
+        Returns:
+            np.ndarray: 缓存的最短路矩阵, 未命中或矩阵对角线有负值(图含负权重环)时为None
+        """
+        matrixPath, metaPath = self._paths(key)
+        try:
+            with open(metaPath, 'r') as f:
+                meta = json.load(f)
+            if versions.get(meta['algorithm']) != meta['version']:
+                raise KeyError(meta['algorithm'])
+            dist = np.load(matrixPath)
+            if (np.diag(dist) < 0).any():
+                raise ValueError("negative cycle")
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(matrixPath)
+        self.hits += 1
+        return dist
+
+    def put(self, key: str, dist: np.ndarray, algorithm: str, version: int) -> None:
+        """写入缓存并按LRU淘汰超出大小上限的条目, 对角线有负值的矩阵(图含负权重环, 矩阵无意义)不写入
+
+        Args:
+            key (str): key()的返回值
+            dist (np.ndarray): 最短路矩阵
+            algorithm (str): 计算该矩阵的算法名
+            version (int): 该算法的版本
+        """
+        if (np.diag(dist) < 0).any():
+            return
+        matrixPath, metaPath = self._paths(key)
+        # 先写临时文件再改名, 避免并发读取到写了一半的条目
+        temporary = f'{matrixPath}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, dist)
+        os.replace(temporary, matrixPath)
+        with open(f'{metaPath}.{os.getpid()}.tmp', 'w') as f:
+            json.dump({'algorithm': algorithm, 'version': version, 'n': int(dist.shape[0]),
+                       'dtype': dist.dtype.str, 'created': time.time()}, f)
+        os.replace(f'{metaPath}.{os.getpid()}.tmp', metaPath)
+        self.evict()
+
+    def evict(self) -> list:
+        """按访问时间从旧到新删除条目, 直到总大小不超过maxBytes
+
+        Returns:
+            list: 被删除条目的键
+        """
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.npy'):
+                stat = os.stat(os.path.join(self.directory, file_name))
+                entries.append((stat.st_mtime, stat.st_size, file_name[:-len('.npy')]))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, key in entries:
+            if total <= self.maxBytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            evicted.append(key)
+        return evicted
+
+    def clear(self) -> None:
+        """删除全部条目"""
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(('.npy', '.json')):
+                os.remove(os.path.join(self.directory, file_name))
+
+    def __len__(self) -> int:
+        return sum(1 for file_name in os.listdir(self.directory) if file_name.endswith('.npy'))
@@ -0,0 +1,197 @@
+import numpy as np
+import networkx as nx
+
+from typing import Union
+
+class CompactGraph:
+    """以CSR(出边)与CSC(入边)数组表示的紧凑图, 一次构造后供所有最短路算法复用
+
+    节点编号为0..n-1; 无向图的每条边在CSR/CSC中按两个方向各存一次
+
+    Attributes:
+        n (int): 点数
+        directed (bool): 是否有向图
+        src, dst, weight (np.ndarray): 原始边数组, 无向图每条边只出现一次
+        indptr, indices, weights (np.ndarray): CSR表示, 点u的出边为indices[indptr[u]:indptr[u+1]]
+        rindptr, rindices, rweights (np.ndarray): CSC表示, 点v的入边为rindices[rindptr[v]:rindptr[v+1]]
+        nodes (list): 原图的节点标签, 节点标签恰为0..n-1时为None
+    """
+
+    def __init__(self, n: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray, directed: bool = True, nodes: list = None) -> None:
+        """由边数组构造紧凑图
+
+        Args:
+            n (int): 点数
+            src (np.ndarray): 边起点数组
+            dst (np.ndarray): 边终点数组
+            weight (np.ndarray): 边权重数组
+            directed (bool, optional): 是否有向图. Defaults to True.
+            nodes (list, optional): 原图的节点标签. Defaults to None.
+        """
+        self.n = n
+        self.directed = directed
+        self.nodes = nodes
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        if not (self.src.shape == self.dst.shape == self.weight.shape):
+            raise ValueError("src, dst and weight should have the same length")
+
+        if directed:
+            arcSrc, arcDst, arcWeight = self.src, self.dst, self.weight
+        else:
+            arcSrc = np.concatenate([self.src, self.dst])
+            arcDst = np.concatenate([self.dst, self.src])
+            arcWeight = np.concatenate([self.weight, self.weight])
+        self.indptr, self.indices, self.weights = _buildCompressed(n, arcSrc, arcDst, arcWeight)
+        if directed:
+            self.rindptr, self.rindices, self.rweights = _buildCompressed(n, arcDst, arcSrc, arcWeight)
+        else:
+            # 无向图的入边与出边相同, 直接共享数组
+            self.rindptr, self.rindices, self.rweights = self.indptr, self.indices, self.weights
+
+    @classmethod
+    def fromNetworkx(cls, Graph: Union[nx.Graph, nx.DiGraph]) -> 'CompactGraph':
+        """由networkx图构造紧凑图
+
+        Args:
+            Graph (Union[nx.Graph, nx.DiGraph]): networkx.Graph / networkx.DiGraph 表示的图, 边需有weight属性
+
+        Returns:
+            CompactGraph: 紧凑图
+        """
+        nodes = list(Graph.nodes())
+        edges = list(Graph.edges(data='weight'))
+        return cls._fromLabels(nodes, edges, isinstance(Graph, nx.DiGraph))
+
+    @classmethod
+    def fromNodeLink(cls, data: dict) -> 'CompactGraph':
+        """由networkx node-link格式的JSON数据构造紧凑图, 不经过networkx对象
+
+        Args:
+            data (dict): json_graph.node_link_data格式的字典
+
+        Returns:
+            CompactGraph: 紧凑图
+        """
+        nodes = [node['id'] for node in data['nodes']]
+        links = data['links'] if 'links' in data else data['edges']
+        edges = [(link['source'], link['target'], link['weight']) for link in links]
+        return cls._fromLabels(nodes, edges, data['directed'])
+
+    @classmethod
+    def _fromLabels(cls, nodes: list, edges: list, directed: bool) -> 'CompactGraph':
+        """由节点标签列表与(u, v, weight)边列表构造紧凑图, 标签不为0..n-1时按列表顺序重新编号"""
+        n = len(nodes)
+        edgeArray = np.array(edges, dtype=object).reshape(-1, 3)
+        if set(nodes) == set(range(n)):
+            src = edgeArray[:, 0].astype(np.int32)
+            dst = edgeArray[:, 1].astype(np.int32)
+            nodes = None
+        else:
+            index = {node: i for i, node in enumerate(nodes)}
+            src = np.array([index[u] for u in edgeArray[:, 0]], dtype=np.int32)
+            dst = np.array([index[v] for v in edgeArray[:, 1]], dtype=np.int32)
+        if any(w is None for w in edgeArray[:, 2]):
+            raise ValueError("Every edge should have a weight attribute")
+        weight = edgeArray[:, 2].astype(np.float64)
+        return cls(n, src, dst, weight, directed, nodes)
+
+    def toNetworkx(self) -> Union[nx.Graph, nx.DiGraph]:
+        """转换为networkx图, 整数权重保持为int
+
+        Returns:
+            Union[nx.Graph, nx.DiGraph]: networkx.Graph / networkx.DiGraph 表示的图
+        """
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(range(self.n) if self.nodes is None else self.nodes)
+        weight = self.weight
+        if np.array_equal(weight, np.round(weight)):
+            weight = weight.astype(np.int64)
+        weight = weight.tolist()
+        src, dst = self.src.tolist(), self.dst.tolist()
+        if self.nodes is not None:
+            src = [self.nodes[u] for u in src]
+            dst = [self.nodes[v] for v in dst]
+        G.add_weighted_edges_from(zip(src, dst, weight))
+        return G
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def numberOfEdges(self) -> int:
+        """原图的边数(无向图每条边计一次)"""
+        return len(self.weight)
+
+    @property
+    def maxIntegerWeight(self) -> int:
+        """边权重均为非负整数时返回最大权重, 否则返回None"""
+        if self.weight.size == 0:
+            return 0
+        if self.weight.min() < 0 or not np.array_equal(self.weight, np.round(self.weight)):
+            return None
+        return int(self.weight.max())
+
+    def outEdges(self, u: int) -> tuple:
+        """返回点u的出边
+
+        Args:
+            u (int): 点的编号
+
+        Returns:
+            tuple: (终点数组, 权重数组), 均为CSR数组的视图
+        """
+        begin, end = self.indptr[u], self.indptr[u + 1]
+        return self.indices[begin:end], self.weights[begin:end]
+
+    def inEdges(self, v: int) -> tuple:
+        """返回点v的入边
+
+        Args:
+            v (int): 点的编号
+
+        Returns:
+            tuple: (起点数组, 权重数组), 均为CSC数组的视图
+        """
+        begin, end = self.rindptr[v], self.rindptr[v + 1]
+        return self.rindices[begin:end], self.rweights[begin:end]
+
+    def arcs(self) -> tuple:
+        """返回所有有向弧(无向图每条边按两个方向各一条), 按起点排序
+
+        Returns:
+            tuple: (src, dst, weight)
+        """
+        src = np.repeat(np.arange(self.n, dtype=np.int32), np.diff(self.indptr))
+        return src, self.indices, self.weights
+
+def _buildCompressed(n: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray) -> tuple:
+    """将边数组按起点排序压缩为(indptr, indices, weights)
+
+    Args:
+        n (int): 点数
+        src (np.ndarray): 边起点数组
+        dst (np.ndarray): 边终点数组
+        weight (np.ndarray): 边权重数组
+
+    Returns:
+        tuple: (indptr, indices, weights)
+    """
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, np.ascontiguousarray(dst[order]), np.ascontiguousarray(weight[order])
+
+def toCompactGraph(Graph: Union[nx.Graph, nx.DiGraph, CompactGraph]) -> CompactGraph:
+    """将输入图统一转换为CompactGraph, 已是CompactGraph时原样返回
+
+    Args:
+        Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图
+
+    Returns:
+        CompactGraph: 紧凑图
+    """
+    if isinstance(Graph, CompactGraph):
+        return Graph
+    return CompactGraph.fromNetworkx(Graph)
@@ -0,0 +1,115 @@
+import numpy as np
+import networkx as nx
+
+from typing import Union
+
+from codes.algorithm import Floyd, _edgeArray, _isDirected, _dijkstraBinaryHeap
+from codes.compactGraph import CompactGraph
+
+class DynamicAPSP:
+    """可随单条边的变化增量更新的最短路矩阵
+
+    边插入/权重减小时以新边松弛整个矩阵, O(n^2);
+    权重增大/删除边时只有最短路经过该边的起点(受影响的行)需要重算, 以势函数改写权重后对这些行执行Dijkstra,
+    无向图的列与行对称, 一并更新
+
+    Attributes:
+        n (int): 点数
+        directed (bool): 是否有向图
+        weight (np.ndarray): 邻接矩阵, 无边为inf
+        dist (np.ndarray): 当前的最短路矩阵, negativeCycle为True时无意义
+        negativeCycle (bool): 当前图是否含有负权重环
+    """
+
+    def __init__(self, Graph : Union[nx.Graph, nx.DiGraph, CompactGraph], dist : np.ndarray = None) -> None:
+        """由图与其最短路矩阵构造
+
+        Args:
+            Graph (Union[nx.Graph, nx.DiGraph, CompactGraph]): 输入图, 不含负权重环
+            dist (np.ndarray, optional): Floyd/Floyd2对Graph的计算结果, 会被复制. Defaults to None, 即调用Floyd计算.
+        """
+        self.n = len(Graph)
+        self.directed = _isDirected(Graph)
+        self.weight = np.full((self.n, self.n), np.inf)
+        src, dst, weight = _edgeArray(Graph)
+        self.weight[src, dst] = weight
+        if not self.directed:
+            self.weight[dst, src] = weight
+        self.dist = (Floyd(Graph) if dist is None else dist).astype(np.float64, copy=True)
+        self.negativeCycle = bool((np.diag(self.dist) < 0).any())
+
+    def __getitem__(self, pair : tuple) -> float:
+        s, t = pair
+        return self.dist[s, t]
+
+    def setEdge(self, u : int, v : int, weight : float) -> bool:
+        """插入边(u, v)或修改其权重, 无向图同时作用于(v, u)
+
+        Args:
+            u (int): 起点
+            v (int): 终点
+            weight (float): 新权重, inf表示删除
+
+        Returns:
+            bool: 更新后图中是否含有负权重环
+        """
+        if u == v:
+            raise ValueError("Self-loops are not supported")
+        old = self.weight[u, v]
+        self.weight[u, v] = weight
+        if not self.directed:
+            self.weight[v, u] = weight
+        if self.negativeCycle:
+            # 原矩阵已无意义, 只能重新计算
+            self._recompute()
+        elif weight < old:
+            self._decrease(u, v, weight)
+        elif weight > old:
+            self._increase(u, v, old)
+        return self.negativeCycle
+
+    def addEdge(self, u : int, v : int, weight : float) -> bool:
+        """插入边(u, v), 已存在时替换其权重, 同setEdge"""
+        return self.setEdge(u, v, weight)
+
+    def removeEdge(self, u : int, v : int) -> bool:
+        """删除边(u, v), 同setEdge(u, v, inf)"""
+        if np.isinf(self.weight[u, v]):
+            raise KeyError(f"Edge ({u}, {v}) does not exist")
+        return self.setEdge(u, v, np.inf)
+
+    def _decrease(self, u : int, v : int, weight : float) -> None:
+        """边(u, v)的权重减小为weight后, 经过该边的路径为dist[s, u] + weight + dist[v, t]"""
+        dist = self.dist
+        if weight + dist[v, u] < 0 or (not self.directed and weight < 0):
+            self.negativeCycle = True
+            return
+        np.minimum(dist, dist[:, u, None] + weight + dist[None, v, :], out=dist)
+        if not self.directed:
+            np.minimum(dist, dist[:, v, None] + weight + dist[None, u, :], out=dist)
+
+    def _increase(self, u : int, v : int, old : float) -> None:
+        """边(u, v)的权重由old增大后, 只重算最短路可能经过该边的起点"""
+        dist = self.dist
+        # 最短路经过(u, v)的起点s必满足dist[s, u] + old == dist[s, v], 其余行不受影响
+        affected = np.isfinite(dist[:, u]) & np.isclose(dist[:, u] + old, dist[:, v])
+        if not self.directed:
+            affected |= np.isfinite(dist[:, v]) & np.isclose(dist[:, v] + old, dist[:, u])
+        rows = np.flatnonzero(affected)
+        if rows.size == 0:
+            return
+        # h[x] = min_s dist[s, x]即从虚拟源点出发的最短路, 对原图可行, 权重只增不减时对新图仍可行
+        potential = dist.min(axis=0)
+        src, dst = np.nonzero(np.isfinite(self.weight))
+        reweighted = CompactGraph(self.n, src, dst, np.maximum(self.weight[src, dst] + potential[src] - potential[dst], 0), directed=True)
+        for s in rows:
+            dist[s] = np.array(_dijkstraBinaryHeap(reweighted, int(s), None)[0]) - potential[s] + potential
+        if not self.directed:
+            dist[:, rows] = dist[rows, :].T
+
+    def _recompute(self) -> None:
+        """由邻接矩阵重新执行Floyd算法并重新判断负权重环"""
+        src, dst = np.nonzero(np.isfinite(self.weight))
+        dist = Floyd(CompactGraph(self.n, src, dst, self.weight[src, dst], directed=True))
+        self.negativeCycle = bool((np.diag(dist) < 0).any())
+        self.dist = dist
@@ -0,0 +1,160 @@
+class PairingNode:
+    """配对堆的节点, 由PairingHeap.push返回, 用于decreaseKey"""
+    __slots__ = ('key', 'item', 'child', 'sibling', 'prev')
+
+    def __init__(self, key, item) -> None:
+        self.key = key
+        self.item = item
+        self.child = None
+        self.sibling = None
+        # 指向左兄弟, 若为最左孩子则指向父节点
+        self.prev = None
+
+class PairingHeap:
+    """最小配对堆, push/decreaseKey均摊O(1), pop均摊O(log n)"""
+
+    def __init__(self) -> None:
+        self.root = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key, item) -> PairingNode:
+        """插入元素
+
+        Args:
+            key: 优先级, 越小越先弹出
+            item: 元素
+
+        Returns:
+            PairingNode: 元素对应的节点, 可传入decreaseKey
+        """
+        node = PairingNode(key, item)
+        self.root = node if self.root is None else _meld(self.root, node)
+        self.size += 1
+        return node
+
+    def peek(self) -> tuple:
+        """返回最小元素(key, item)但不弹出"""
+        if self.root is None:
+            raise IndexError("peek from an empty heap")
+        return self.root.key, self.root.item
+
+    def pop(self) -> tuple:
+        """弹出最小元素
+
+        Returns:
+            tuple: (key, item)
+        """
+        root = self.root
+        if root is None:
+            raise IndexError("pop from an empty heap")
+        self.root = _mergePairs(root.child)
+        if self.root is not None:
+            self.root.prev = None
+        self.size -= 1
+        return root.key, root.item
+
+    def decreaseKey(self, node: PairingNode, key) -> None:
+        """将节点的优先级降低为key
+
+        Args:
+            node (PairingNode): push返回的节点
+            key: 新的优先级, 不应大于原优先级
+        """
+        if key > node.key:
+            raise ValueError("new key is greater than current key")
+        node.key = key
+        if node is self.root:
+            return
+        # 从父节点的孩子链表中摘下以node为根的子树
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.sibling = None
+        node.prev = None
+        self.root = _meld(self.root, node)
+
+def _meld(a: PairingNode, b: PairingNode) -> PairingNode:
+    """合并两个堆的根, 返回新根"""
+    if b.key < a.key:
+        a, b = b, a
+    b.prev = a
+    b.sibling = a.child
+    if a.child is not None:
+        a.child.prev = b
+    a.child = b
+    return a
+
+def _mergePairs(node: PairingNode) -> PairingNode:
+    """两趟合并孩子链表: 先从左到右两两合并, 再从右到左依次合并"""
+    pairs = []
+    while node is not None:
+        a = node
+        b = a.sibling
+        if b is None:
+            a.sibling = None
+            pairs.append(a)
+            break
+        node = b.sibling
+        a.sibling = b.sibling = None
+        pairs.append(_meld(a, b))
+    if not pairs:
+        return None
+    root = pairs.pop()
+    while pairs:
+        root = _meld(pairs.pop(), root)
+    return root
+
+class RadixHeap:
+    """单调整数优先队列(radix heap), 要求每次push的key不小于最近一次pop的key
+
+    按key与上次弹出值异或后的最高位分桶, push为O(1), pop均摊O(log C), C为最大key
+    """
+
+    def __init__(self) -> None:
+        self.last = 0
+        self.size = 0
+        self.buckets = [[] for _ in range(65)]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, key: int, item) -> None:
+        """插入元素
+
+        Args:
+            key (int): 非负整数优先级, 不小于最近一次pop的key
+            item: 元素
+        """
+        if key < self.last:
+            raise ValueError("RadixHeap keys must be monotone")
+        self.buckets[(key ^ self.last).bit_length()].append((key, item))
+        self.size += 1
+
+    def pop(self) -> tuple:
+        """弹出最小元素
+
+        Returns:
+            tuple: (key, item)
+        """
+        if self.size == 0:
+            raise IndexError("pop from an empty heap")
+        buckets = self.buckets
+        if not buckets[0]:
+            # 找到第一个非空桶, 以其中最小key为新的基准重新分桶
+            i = 1
+            while not buckets[i]:
+                i += 1
+            entries = buckets[i]
+            buckets[i] = []
+            last = min(entry[0] for entry in entries)
+            self.last = last
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self.size -= 1
+        return buckets[0].pop()
@@ -1,24 +1,103 @@
 import networkx as nx
 import graphviz
+import functools
+import hashlib
+import json
 import os
 import random
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import Union
 
-# 设置输出目录与检查
-dot_output_directory = 'data/graphs/'  
+# 输出目录, 在第一次渲染时才创建
+dot_output_directory = 'data/graphs/'
 png_output_directory = 'data/photos/'
-try:
-    os.makedirs(dot_output_directory, exist_ok=True)
-    os.makedirs(png_output_directory, exist_ok=True)
-except:
-    print('Directory already exists')
-    exit(1)
-base_file_name = 'randomGraph1'
-
-def renderGraph(G: Union[nx.Graph, nx.DiGraph]):
+# 超过该点数的图在渲染前降采样
+RENDER_MAX_NODES = 60
+
+def graphHash(G: Union[nx.Graph, nx.DiGraph], **options) -> str:
+    """计算图内容(点、带权边、是否有向)与渲染选项的哈希, 作为输出文件名, 与点/边的插入顺序无关
+
+    Args:
+        G (Union[nx.Graph, nx.DiGraph]): 输入图
+        **options: 影响渲染结果的选项, 如maxNodes、centers
+
+    Returns:
+        str: 十六进制sha256摘要的前16位
+    """
+    directed = G.is_directed()
+    edges = []
+    # 用repr区分1与'1'这类str相同的点
+    for u, v, weight in G.edges(data='weight'):
+        u, v = repr(u), repr(v)
+        if not directed:
+            u, v = min(u, v), max(u, v)
+        edges.append((u, v, repr(weight)))
+    content = {'directed': directed, 'nodes': sorted(repr(node) for node in G.nodes()), 'edges': sorted(edges),
+               'options': {key: str(value) for key, value in sorted(options.items())}}
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+def downsampleGraph(G: Union[nx.Graph, nx.DiGraph], maxNodes: int = RENDER_MAX_NODES, centers: list = None,
+                    hops: int = 1, seed: int = 0) -> Union[nx.Graph, nx.DiGraph]:
+    """将点数超过maxNodes的图截取为不超过maxNodes个点的导出子图
+
+    给定centers时从这些点出发(忽略边的方向)按广度优先取hops跳以内的点, 否则随机抽取maxNodes个点
+
+    Args:
+        G (Union[nx.Graph, nx.DiGraph]): 输入图
+        maxNodes (int, optional): 点数上限, None表示不截取. Defaults to RENDER_MAX_NODES.
+        centers (list, optional): k跳子图的中心点. Defaults to None.
+        hops (int, optional): k跳子图的跳数. Defaults to 1.
+        seed (int, optional): 随机抽样的种子. Defaults to 0.
+
+    Returns:
+        Union[nx.Graph, nx.DiGraph]: 不超过maxNodes个点的子图, 无需截取时为G本身
+    """
+    if centers is None and (maxNodes is None or len(G) <= maxNodes):
+        return G
+    if centers is None:
+        nodes = random.Random(seed).sample(list(G.nodes()), maxNodes)
+        return G.subgraph(nodes).copy()
+    undirected = G.to_undirected(as_view=True) if G.is_directed() else G
+    nodes = list(dict.fromkeys(centers))
+    visited = set(nodes)
+    frontier = nodes
+    for _ in range(hops):
+        frontier = [v for u in frontier for v in undirected[u] if not (v in visited or visited.add(v))]
+        nodes.extend(frontier)
+    return G.subgraph(nodes if maxNodes is None else nodes[:maxNodes]).copy()
+
+def renderGraph(G: Union[nx.Graph, nx.DiGraph], fileName: str = None, maxNodes: int = RENDER_MAX_NODES, centers: list = None,
+                hops: int = 1, seed: int = 0, dotDirectory: str = None, pngDirectory: str = None) -> str:
+    """将图渲染为PNG, dot源文件保存到dotDirectory
+
+    未给定fileName时以graphHash命名, 同名PNG已存在时跳过渲染; 点数过多的图先经downsampleGraph截取
+
+    Args:
+        G (Union[nx.Graph, nx.DiGraph]): 输入图
+        fileName (str, optional): 输出文件名(不含扩展名), 给定时总是重新渲染. Defaults to None.
+        maxNodes (int, optional): 渲染的点数上限, None表示不截取. Defaults to RENDER_MAX_NODES.
+        centers (list, optional): 截取k跳子图的中心点. Defaults to None, 即随机抽样.
+        hops (int, optional): k跳子图的跳数. Defaults to 1.
+        seed (int, optional): 随机抽样的种子. Defaults to 0.
+        dotDirectory (str, optional): dot源文件目录. Defaults to None, 即dot_output_directory.
+        pngDirectory (str, optional): PNG目录. Defaults to None, 即png_output_directory.
+
+    Returns:
+        str: PNG文件路径
+    """
+    dotDirectory = dot_output_directory if dotDirectory is None else dotDirectory
+    pngDirectory = png_output_directory if pngDirectory is None else pngDirectory
+    if fileName is None:
+        fileName = graphHash(G, maxNodes=maxNodes, centers=centers, hops=hops, seed=seed)
+        if os.path.isfile(os.path.join(pngDirectory, fileName + '.png')):
+            return os.path.join(pngDirectory, fileName + '.png')
+    os.makedirs(dotDirectory, exist_ok=True)
+    os.makedirs(pngDirectory, exist_ok=True)
+    G = downsampleGraph(G, maxNodes, centers, hops, seed)
+
     # 创建一个 Graphviz 的 graph 对象
-    if isinstance(G, nx.DiGraph):
+    if G.is_directed():
         dot = graphviz.Digraph()
     else:
         dot = graphviz.Graph()
@@ -27,9 +106,34 @@ def renderGraph(G: Union[nx.Graph, nx.DiGraph]):
     for node in G.nodes():
         dot.node(str(node), shape='circle', label=str(node), style='filled', fillcolor='lightblue')
 
-    for edge in G.edges():
-        dot.edge(str(edge[0]), str(edge[1]), label=str(G[edge[0]][edge[1]]['weight']))
+    for u, v, weight in G.edges(data='weight'):
+        dot.edge(str(u), str(v), label=str(weight))
 
     # 渲染图
-    dot.render(f'{png_output_directory}{base_file_name}', format='png', view=False)  # 生成 PNG 文件
-    os.rename(f'{png_output_directory}{base_file_name}', f'{dot_output_directory}{base_file_name}')  # 移动 dot 文件
\ No newline at end of file
+    png_path = dot.render(filename=fileName, directory=pngDirectory, format='png', view=False)  # 生成 PNG 文件
+    os.replace(os.path.join(pngDirectory, fileName), os.path.join(dotDirectory, fileName))  # 移动 dot 文件
+    return png_path
+
+def renderGraphs(graphs: list, workers: int = None, **options) -> list:
+    """用进程池批量渲染图, 内容相同的图只渲染一次, 已渲染过的图直接跳过
+
+    Args:
+        graphs (list): networkx图列表
+        workers (int, optional): 进程数, 1表示在当前进程中依次渲染. Defaults to None, 即CPU核数.
+        **options: 传给renderGraph的参数(fileName除外)
+
+    Returns:
+        list: 与graphs一一对应的PNG文件路径
+    """
+    render = functools.partial(renderGraph, **options)
+    # 与renderGraph计算文件名时使用相同的选项
+    hashOptions = {'maxNodes': options.get('maxNodes', RENDER_MAX_NODES), 'centers': options.get('centers'),
+                   'hops': options.get('hops', 1), 'seed': options.get('seed', 0)}
+    keys = [graphHash(G, **hashOptions) for G in graphs]
+    unique = dict(zip(keys, graphs))
+    if workers == 1 or len(unique) <= 1:
+        paths = dict(zip(unique, map(render, unique.values())))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            paths = dict(zip(unique, executor.map(render, unique.values())))
+    return [paths[key] for key in keys]
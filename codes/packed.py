@@ -0,0 +1,123 @@
+import numpy as np
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+class PackedSymmetricMatrix:
+    """只存储上三角(含对角线)的对称矩阵, 用于无向图的最短路矩阵, 内存约为稠密矩阵的一半
+
+    采用矩形压缩布局: 点数补齐为偶数N后, 第p行(p < N/2)依次存放上三角第p行(N - p个元素)
+    与倒序的上三角第N-1-p行(p + 1个元素), 整体为(N/2, N + 1)的二维数组, 使对称松弛可以整块向量化
+
+    Attributes:
+        n (int): 点数
+        data (np.ndarray): (N/2, N + 1)的压缩数组
+    """
+
+    def __init__(self, n: int, dtype: np.dtype = np.float64, fill: float = np.inf) -> None:
+        """构造对角线为0、其余元素为fill的矩阵
+
+        Args:
+            n (int): 点数
+            dtype (np.dtype, optional): 元素类型, 只支持浮点类型. Defaults to np.float64.
+            fill (float, optional): 非对角线元素的初始值. Defaults to np.inf.
+        """
+        if not np.issubdtype(np.dtype(dtype), np.floating):
+            raise ValueError("PackedSymmetricMatrix supports floating dtypes only")
+        self.n = n
+        self._N = n + n % 2
+        self.data = np.full((self._N // 2, self._N + 1), fill, dtype=dtype)
+        diagonal = np.arange(self._N)
+        self.data[self._index(diagonal, diagonal)] = 0
+
+    @classmethod
+    def fromDense(cls, dense: np.ndarray) -> 'PackedSymmetricMatrix':
+        """由对称的稠密矩阵构造, 只读取上三角
+
+        Args:
+            dense (np.ndarray): (n, n)对称矩阵
+
+        Returns:
+            PackedSymmetricMatrix: 压缩矩阵
+        """
+        n = dense.shape[0]
+        matrix = cls(n, dense.dtype if np.issubdtype(dense.dtype, np.floating) else np.float64)
+        for i in range(n):
+            matrix[i, np.arange(i, n)] = dense[i, i:]
+        return matrix
+
+    def _index(self, i, j) -> tuple:
+        """返回(i, j)在data中的位置(行数组, 列数组), i与j可为数组, 无需i <= j"""
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        N = self._N
+        upper = i < N // 2
+        p = np.where(upper, i, N - 1 - i)
+        c = np.where(upper, j - i, 2 * N - 1 - j - p)
+        return p, c
+
+    def __getitem__(self, key: tuple):
+        i, j = key
+        return self.data[self._index(i, j)]
+
+    def __setitem__(self, key: tuple, value) -> None:
+        i, j = key
+        self.data[self._index(i, j)] = value
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def shape(self) -> tuple:
+        return (self.n, self.n)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.data.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def row(self, k: int) -> np.ndarray:
+        """返回第k行(即第k列)的全部n个元素"""
+        return self[np.full(self.n, k), np.arange(self.n)]
+
+    def toDense(self) -> np.ndarray:
+        """展开为(n, n)稠密矩阵
+
+        Returns:
+            np.ndarray: 稠密矩阵, 修改它不影响压缩矩阵
+        """
+        dense = np.empty((self.n, self.n), dtype=self.dtype)
+        for i in range(self.n):
+            dense[i] = self.row(i)
+        return dense
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        dense = self.toDense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def floydWarshall(self) -> 'PackedSymmetricMatrix':
+        """原地执行对称的Floyd算法
+
+        中间点k的松弛为d(i, j) = min(d(i, j), r[i] + r[j]), r为第k行; 在压缩布局下data[p, c]对应的r[j]
+        恰为e[p + c], e = concatenate(r, r[::-1]), 因此每个k只需一次滑动窗口视图与两次整块加法
+
+        Returns:
+            PackedSymmetricMatrix: 自身
+        """
+        N = self._N
+        h = N // 2
+        data = self.data
+        rows = np.arange(h)
+        # right[p, c]: data[p, c]属于上三角第N-1-p行(倒序部分), 否则属于第p行
+        right = np.arange(N + 1)[None, :] >= (N - rows)[:, None]
+        candidate = np.empty_like(data)
+        r = np.empty(N, dtype=data.dtype)
+        for k in range(self.n):
+            r[:self.n] = self.row(k)
+            r[self.n:] = np.inf
+            window = sliding_window_view(np.concatenate([r, r[::-1]]), N + 1)[:h]
+            np.add(window, r[:h, None], out=candidate)
+            np.add(window, r[N - 1 - rows, None], out=candidate, where=right)
+            np.minimum(data, candidate, out=data)
+        return self
@@ -0,0 +1,76 @@
+import numpy as np
+
+def nextHopDtype(n: int) -> np.dtype:
+    """返回n个点的next-hop矩阵/前驱数组使用的整数类型, 点数少于32768时为int16, 否则为int32
+
+    Args:
+        n (int): 点数
+
+    Returns:
+        np.dtype: 整数类型, -1表示无下一跳/无前驱
+    """
+    # 点的编号为0..n-1, int16可表示的最大编号为32767
+    return np.dtype(np.int16) if n <= np.iinfo(np.int16).max + 1 else np.dtype(np.int32)
+
+def iterNextHop(nextHop: np.ndarray, s: int, t: int):
+    """沿next-hop矩阵逐个生成从s到t的最短路上的点, 不可达时不生成任何点
+
+    Args:
+        nextHop (np.ndarray): Floyd(returnPath=True)返回的next-hop矩阵, nextHop[i, j]为i到j最短路上i的下一个点
+        s (int): 起点
+        t (int): 终点
+
+    Raises:
+        ValueError: 路径长度超过点数, 即next-hop矩阵中有环(原图含负权重环)
+
+    Yields:
+        int: 路径上的点, 依次为s, ..., t
+    """
+    if nextHop[s, t] < 0:
+        return
+    u = s
+    yield u
+    for _ in range(len(nextHop)):
+        if u == t:
+            return
+        u = int(nextHop[u, t])
+        yield u
+    raise ValueError(f"Next-hop matrix contains a cycle on the path from {s} to {t}")
+
+def iterPredecessors(pred: np.ndarray, t: int):
+    """沿前驱数组逐个生成从t回到起点的点
+
+    Args:
+        pred (np.ndarray): 单源算法returnPath=True时返回的前驱数组, 起点与不可达的点为-1
+        t (int): 终点
+
+    Raises:
+        ValueError: 回溯的点数超过点数, 即前驱数组中有环(原图含负权重环)
+
+    Yields:
+        int: 路径上的点, 依次为t, pred[t], ..., 起点
+    """
+    u = t
+    for _ in range(len(pred)):
+        yield u
+        u = int(pred[u])
+        if u < 0:
+            return
+    raise ValueError(f"Predecessor array contains a cycle on the path to {t}")
+
+def reconstructPath(pred: np.ndarray, s: int, t: int) -> list:
+    """由前驱数组还原从s到t的最短路
+
+    Args:
+        pred (np.ndarray): 以s为起点的前驱数组
+        s (int): 起点
+        t (int): 终点
+
+    Returns:
+        list: 路径上的点, 依次为s, ..., t, 不可达时为空列表
+    """
+    path = list(iterPredecessors(pred, t))
+    if path[-1] != s:
+        return []
+    path.reverse()
+    return path
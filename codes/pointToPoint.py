@@ -0,0 +1,196 @@
+import heapq
+import random
+
+import numpy as np
+import networkx as nx
+
+from typing import Union
+
+from codes.algorithm import _dijkstraBinaryHeap
+from codes.compactGraph import CompactGraph, toCompactGraph
+from codes.stats import SearchStats, phaseTimer
+
+def BidirectionalDijkstra(Graph : Union[nx.Graph, CompactGraph], start : int, target : int, stats : SearchStats = None) -> float:
+    """返回start到target的最短路长度, 使用双向Dijkstra算法, 要求边权重非负
+
+    从start沿出边(CSR)、从target沿入边(CSC)交替扩展堆顶较小的一侧, 两侧堆顶之和不小于当前最优值时停止;
+    距离只保存在已访问的点上, 单次查询的开销与搜索到的点数成正比, 与图的规模无关
+
+    Args:
+        Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图, 多次查询时应先转换为CompactGraph
+        start (int): 起点
+        target (int): 终点
+        stats (SearchStats, optional): 运行统计, 给定时累加两侧的计数与各阶段耗时. Defaults to None.
+
+    Returns:
+        float: 最短路长度, 不可达为inf
+    """
+    with phaseTimer(stats, 'build'):
+        Graph = toCompactGraph(Graph)
+    if Graph.weights.size > 0 and Graph.weights.min() < 0:
+        raise ValueError("Dijkstra requires non-negative edge weights")
+    if start == target:
+        if stats is not None:
+            stats.add(calls=1)
+        return 0.0
+    # 0为正向(出边), 1为反向(入边)
+    adjacency = [(Graph.indptr, Graph.indices, Graph.weights), (Graph.rindptr, Graph.rindices, Graph.rweights)]
+    dist = [{start: 0.0}, {target: 0.0}]
+    settled = [set(), set()]
+    queues = [[(0.0, start)], [(0.0, target)]]
+    best = float('inf')
+    pushes = 2
+    pops = attempts = successes = 0
+    with phaseTimer(stats, 'solve'):
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            d, u = heapq.heappop(queues[side])
+            pops += 1
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            indptr, indices, weights = adjacency[side]
+            other = dist[1 - side]
+            begin, end = indptr[u], indptr[u + 1]
+            attempts += end - begin
+            for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+                nd = d + weight
+                if nd < dist[side].get(v, float('inf')):
+                    dist[side][v] = nd
+                    heapq.heappush(queues[side], (nd, v))
+                    pushes += 1
+                    successes += 1
+                    if v in other and nd + other[v] < best:
+                        best = nd + other[v]
+    if stats is not None:
+        stats.add(calls=1, relaxAttempts=attempts, relaxSuccesses=successes, pushes=pushes, pops=pops,
+                  settled=len(settled[0]) + len(settled[1]))
+    return best
+
+class LandmarkIndex:
+    """ALT(A*, Landmarks, Triangle inequality)点对点查询索引, 一次预处理后可供任意多次查询复用
+
+    预处理选取k个地标L并计算d(L, v)与d(v, L); 由三角不等式,
+    h(v) = max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L))是d(v, t)的下界且满足一致性, 作为A*的启发函数
+
+    Attributes:
+        graph (CompactGraph): 紧凑图
+        landmarks (list): 地标编号
+        fromLandmark (np.ndarray): (n, k)数组, fromLandmark[v, i] = d(landmarks[i], v)
+        toLandmark (np.ndarray): (n, k)数组, toLandmark[v, i] = d(v, landmarks[i]), 无向图与fromLandmark相同
+    """
+
+    def __init__(self, Graph : Union[nx.Graph, CompactGraph], k : int = 8, method : str = 'farthest', seed : int = None) -> None:
+        """选取地标并预计算地标的距离数组
+
+        Args:
+            Graph (Union[nx.Graph, CompactGraph]): networkx.Graph / networkx.DiGraph / CompactGraph 表示的图, 边权重非负
+            k (int, optional): 地标数量, 超过点数时取点数. Defaults to 8.
+            method (str, optional): 'farthest'为依次选取离已选地标最远的点, 'random'为随机选取. Defaults to 'farthest'.
+            seed (int, optional): 随机种子. Defaults to None.
+        """
+        Graph = toCompactGraph(Graph)
+        if Graph.weights.size > 0 and Graph.weights.min() < 0:
+            raise ValueError("ALT requires non-negative edge weights")
+        self.graph = Graph
+        n = Graph.n
+        k = min(k, n)
+        rng = random.Random(seed)
+        reverse = CompactGraph(n, Graph.dst, Graph.src, Graph.weight, directed=True) if Graph.directed else Graph
+
+        fromLandmark = []
+        toLandmark = []
+        landmarks = []
+        if method == 'farthest':
+            # 从随机点出发的最远点作为第一个地标, 之后每次选取到已选地标最近距离最大的点
+            distance = np.array(_dijkstraBinaryHeap(Graph, rng.randrange(n), None)[0]) if n > 0 else np.empty(0)
+            for _ in range(k):
+                candidates = np.flatnonzero(np.isfinite(distance))
+                candidates = candidates[~np.isin(candidates, landmarks)]
+                if candidates.size == 0:
+                    candidates = np.setdiff1d(np.arange(n), landmarks)
+                    landmark = int(candidates[rng.randrange(candidates.size)])
+                else:
+                    landmark = int(candidates[np.argmax(distance[candidates])])
+                self._addLandmark(landmark, Graph, reverse, landmarks, fromLandmark, toLandmark)
+                distance = fromLandmark[-1] if len(landmarks) == 1 else np.minimum(distance, fromLandmark[-1])
+        elif method == 'random':
+            for landmark in rng.sample(range(n), k):
+                self._addLandmark(landmark, Graph, reverse, landmarks, fromLandmark, toLandmark)
+        else:
+            raise ValueError(f"Invalid landmark method: {method}")
+        self.landmarks = landmarks
+        self.fromLandmark = np.ascontiguousarray(np.array(fromLandmark).reshape(len(landmarks), n).T)
+        self.toLandmark = self.fromLandmark if not Graph.directed else np.ascontiguousarray(np.array(toLandmark).reshape(len(landmarks), n).T)
+
+    @staticmethod
+    def _addLandmark(landmark : int, Graph : CompactGraph, reverse : CompactGraph, landmarks : list, fromLandmark : list, toLandmark : list) -> None:
+        """计算地标的正向与反向距离数组并加入列表"""
+        landmarks.append(landmark)
+        fromLandmark.append(np.array(_dijkstraBinaryHeap(Graph, landmark, None)[0]))
+        toLandmark.append(fromLandmark[-1] if reverse is Graph else np.array(_dijkstraBinaryHeap(reverse, landmark, None)[0]))
+
+    def lowerBound(self, v : int, target : int) -> float:
+        """返回d(v, target)的下界h(v)
+
+        Args:
+            v (int): 点的编号
+            target (int): 终点
+
+        Returns:
+            float: 下界, 由地标可判定不可达时为inf
+        """
+        with np.errstate(invalid='ignore'):
+            bounds = np.concatenate([self.fromLandmark[target] - self.fromLandmark[v], self.toLandmark[v] - self.toLandmark[target]])
+        bounds = bounds[~np.isnan(bounds)]
+        return max(0.0, float(bounds.max())) if bounds.size > 0 else 0.0
+
+    def query(self, start : int, target : int, stats : SearchStats = None) -> float:
+        """返回start到target的最短路长度, 使用以地标下界为启发函数的A*算法
+
+        Args:
+            start (int): 起点
+            target (int): 终点
+            stats (SearchStats, optional): 运行统计, 给定时累加计数与耗时. Defaults to None.
+
+        Returns:
+            float: 最短路长度, 不可达为inf
+        """
+        Graph = self.graph
+        indptr, indices, weights = Graph.indptr, Graph.indices, Graph.weights
+        dist = {start: 0.0}
+        bound = {}
+        settled = set()
+        queue = [(0.0, start)]
+        result = float('inf')
+        pushes = 1
+        pops = attempts = successes = 0
+        with phaseTimer(stats, 'solve'):
+            while queue:
+                _, u = heapq.heappop(queue)
+                pops += 1
+                if u in settled:
+                    continue
+                settled.add(u)
+                if u == target:
+                    result = dist[u]
+                    break
+                d = dist[u]
+                begin, end = indptr[u], indptr[u + 1]
+                attempts += end - begin
+                for v, weight in zip(indices[begin:end].tolist(), weights[begin:end].tolist()):
+                    nd = d + weight
+                    if nd < dist.get(v, float('inf')):
+                        if v not in bound:
+                            bound[v] = self.lowerBound(v, target)
+                        if bound[v] == float('inf'):
+                            continue
+                        dist[v] = nd
+                        heapq.heappush(queue, (nd + bound[v], v))
+                        pushes += 1
+                        successes += 1
+        if stats is not None:
+            stats.add(calls=1, relaxAttempts=attempts, relaxSuccesses=successes, pushes=pushes, pops=pops, settled=len(settled))
+        return result
@@ -1,19 +1,92 @@
 import networkx as nx
+import numpy as np
 import graphviz
 import os
 import random
 from codes.algorithm import Floyd
-from ioProcess import renderGraph
+from codes.cache import DistanceCache
+from codes.compactGraph import CompactGraph
+from codes.ioProcess import renderGraph
 
 def generateRandomGraph(node: int, temperature: float) -> nx.Graph:
-    # 生成一个随机图
-    G = nx.erdos_renyi_graph(node, temperature)
-    for (u,v) in G.edges():
-        G[u][v]['weight'] = random.randint(1, 10)
-    return G
+    # 生成一个随机图, 种子取自全局random, 边权重为[1, 10]的整数
+    return generateRandomCompactGraph(node, temperature, seed=random.getrandbits(64)).toNetworkx()
+
+def generateRandomEdges(node: int, temperature: float = None, edges: int = None, directed: bool = False,
+                        weightRange: tuple = (1, 10), seed=None) -> tuple:
+    """用NumPy向量化生成G(n,p)或G(n,m)随机图的边数组, 不含自环与重边
+
+    G(n,p)在所有候选点对的线性编号上按几何分布跳跃采样, 只产生被选中的边; G(n,m)不放回地抽取m个编号
+
+    Args:
+        node (int): 点数
+        temperature (float, optional): G(n,p)的边概率, 与edges二选一. Defaults to None.
+        edges (int, optional): G(n,m)的边数, 超过候选点对数时生成完全图. Defaults to None.
+        directed (bool, optional): 是否有向图. Defaults to False.
+        weightRange (tuple, optional): 整数边权重的闭区间. Defaults to (1, 10).
+        seed (optional): np.random.default_rng的种子或Generator. Defaults to None.
+
+    Returns:
+        tuple: (src, dst, weight), src/dst为int32数组, weight为int64数组
+    """
+    if (temperature is None) == (edges is None):
+        raise ValueError("Exactly one of temperature and edges should be given")
+    rng = np.random.default_rng(seed)
+    pairs = node * (node - 1) if directed else node * (node - 1) // 2
+    if temperature is not None:
+        index = _geometricSkip(pairs, temperature, rng)
+    else:
+        index = np.sort(rng.choice(pairs, size=min(edges, pairs), replace=False))
+    src, dst = _pairFromIndex(node, index, directed)
+    weight = rng.integers(weightRange[0], weightRange[1] + 1, size=len(index))
+    return src, dst, weight
+
+def generateRandomCompactGraph(node: int, temperature: float = None, edges: int = None, directed: bool = False,
+                               weightRange: tuple = (1, 10), seed=None) -> CompactGraph:
+    """生成随机图并直接构造为CompactGraph, 参数同generateRandomEdges, 可用toNetworkx转换为networkx图
+
+    Returns:
+        CompactGraph: 随机生成的紧凑图
+    """
+    src, dst, weight = generateRandomEdges(node, temperature, edges, directed, weightRange, seed)
+    return CompactGraph(node, src, dst, weight, directed)
+
+def _geometricSkip(pairs: int, temperature: float, rng: np.random.Generator) -> np.ndarray:
+    """以概率temperature独立选取[0, pairs)中的编号, 按几何分布的间隔分块生成"""
+    if pairs == 0 or temperature <= 0:
+        return np.empty(0, dtype=np.int64)
+    if temperature >= 1:
+        return np.arange(pairs, dtype=np.int64)
+    expected = pairs * temperature
+    chunk = int(expected + 5 * np.sqrt(expected) + 16)
+    blocks = []
+    position = -1
+    while True:
+        index = position + np.cumsum(rng.geometric(temperature, size=chunk))
+        blocks.append(index[index < pairs])
+        if index[-1] >= pairs:
+            break
+        position = index[-1]
+    return np.concatenate(blocks)
+
+def _pairFromIndex(node: int, index: np.ndarray, directed: bool) -> tuple:
+    """将候选点对的线性编号映射为(u, v)
+
+    有向图按u为行、除u外的v为列编号; 无向图只编号u < v的上三角, 第u行之前共有u * (2n - u - 1) / 2个点对
+    """
+    if directed:
+        src = index // (node - 1)
+        dst = index % (node - 1)
+        dst += dst >= src
+    else:
+        rows = np.arange(node, dtype=np.int64)
+        rowStart = rows * (2 * node - rows - 1) // 2
+        src = np.searchsorted(rowStart, index, side='right') - 1
+        dst = index - rowStart[src] + src + 1
+    return src.astype(np.int32), dst.astype(np.int32)
 
 if __name__ == '__main__':
     G = generateRandomGraph(10, 0.3)
     renderGraph(G)
-    dict = Floyd(G)
+    dict = Floyd(G, cache=DistanceCache())
     print(dict)
@@ -0,0 +1,54 @@
+import functools
+
+from codes.algorithm import Floyd, Floyd2, FloydBatch, FloydBlocked, Johnson, Dijsktra, Dial, BellmanFord, BellmanFoldSPFA
+from codes.compactGraph import CompactGraph
+from codes.pointToPoint import BidirectionalDijkstra, LandmarkIndex
+
+def _bidirectionalQuery(Graph : CompactGraph) -> callable:
+    """返回Graph上的双向Dijkstra查询函数(start, target, stats=None) -> float"""
+    return functools.partial(BidirectionalDijkstra, Graph)
+
+def _landmarkQuery(Graph : CompactGraph) -> callable:
+    """为Graph构造一次LandmarkIndex, 返回其查询函数(start, target, stats=None) -> float"""
+    return LandmarkIndex(Graph).query
+
+# 算法名 -> (函数, 调用形式, 是否要求非负权重, 是否要求整数权重, 是否要求无向图, 是否支持负权重环)
+# 调用形式:
+#     'all_pairs': 函数(G, stats=None)返回最短路矩阵
+#     'batch': 函数(graphList, stats=None)返回各图的最短路矩阵列表
+#     'single_source': 函数(G, start, stats=None)返回起点到各点的距离数组
+#     'point_to_point': 函数(G)做预处理并返回查询函数(start, target, stats=None) -> float
+ALGORITHMS = {
+    'Floyd': (Floyd, 'all_pairs', False, False, False, False),
+    'Floyd2': (Floyd2, 'all_pairs', False, False, True, False),
+    'Floyd2Packed': (functools.partial(Floyd2, packed=True), 'all_pairs', False, False, True, False),
+    'FloydBatch': (FloydBatch, 'batch', False, False, False, False),
+    'FloydBlocked': (FloydBlocked, 'all_pairs', False, False, False, False),
+    'Johnson': (functools.partial(Johnson, workers=1), 'all_pairs', False, False, False, False),
+    'Dijsktra': (Dijsktra, 'single_source', True, False, False, False),
+    'Dial': (Dial, 'single_source', True, True, False, False),
+    'BellmanFord': (BellmanFord, 'single_source', False, False, False, True),
+    'BellmanFoldSPFA': (BellmanFoldSPFA, 'single_source', False, False, False, False),
+    'BidirectionalDijkstra': (_bidirectionalQuery, 'point_to_point', True, False, False, False),
+    'ALT': (_landmarkQuery, 'point_to_point', True, False, False, False),
+}
+
+def isApplicable(algorithm : str, Graph : CompactGraph, hasNegativeCycle : bool) -> bool:
+    """判断算法能否用于图Graph
+
+    Args:
+        algorithm (str): ALGORITHMS中的算法名
+        Graph (CompactGraph): 输入图
+        hasNegativeCycle (bool): 图中是否有负权重环
+
+    Returns:
+        bool: 是否适用
+    """
+    _, _, nonNegative, integer, undirected, negativeCycle = ALGORITHMS[algorithm]
+    if nonNegative and Graph.weights.size > 0 and Graph.weights.min() < 0:
+        return False
+    if integer and Graph.maxIntegerWeight is None:
+        return False
+    if undirected and Graph.directed:
+        return False
+    return negativeCycle or not hasNegativeCycle
@@ -0,0 +1,244 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from codes.compactGraph import CompactGraph
+from codes.registry import ALGORITHMS, isApplicable
+from codes.stats import SearchStats
+
+def iterTestCases(filePath : str, chunkSize : int = 1 << 20):
+    """逐个读取测试用例文件中的用例, 不将整个文件载入内存
+
+    测试用例文件为JSON数组, 按块读取并用JSONDecoder.raw_decode依次解码数组元素, 内存中只保留当前用例
+
+    Args:
+        filePath (str): 测试用例JSON文件的路径
+        chunkSize (int, optional): 每次读取的字符数. Defaults to 1 << 20.
+
+    Raises:
+        ValueError: 文件不是JSON数组
+
+    Yields:
+        dict: 用例的JSON对象, 含'graph'(node-link格式)与'shortest_path_matrix'
+    """
+    decoder = json.JSONDecoder()
+    with open(filePath, 'r') as f:
+        buffer = f.read(chunkSize).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{filePath} is not a JSON array of test cases")
+        buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                data, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # 用例不完整, 继续读取; 读取量随缓冲区增长, 保证大用例的总解码开销为线性
+                chunk = f.read(max(chunkSize, len(buffer)))
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield data
+            buffer = buffer[end:]
+
+def _parseMatrix(matrix : list) -> np.ndarray:
+    """将JSON中的最短路矩阵('inf'/'-inf'/'nan'以字符串存储)转换为数组"""
+    if matrix is None:
+        return None
+    return np.array([[float(x) if isinstance(x, str) else x for x in row] for row in matrix], dtype=np.float64)
+
+def matrixEqual(results : np.ndarray, expected : np.ndarray) -> bool:
+    """比较两个最短路矩阵, inf按符号、nan按位置比较, 有限值用np.isclose比较"""
+    results = np.asarray(results, dtype=np.float64)
+    if results.shape != expected.shape:
+        return False
+    finite = np.isfinite(expected)
+    if not np.array_equal(finite, np.isfinite(results)) or not np.array_equal(np.isnan(expected), np.isnan(results)):
+        return False
+    infinite = np.isinf(expected)
+    return bool(np.array_equal(results[infinite], expected[infinite]) and np.isclose(results[finite], expected[finite]).all())
+
+def runCase(algorithm : str, data : dict) -> dict:
+    """对单个用例运行算法并与参考矩阵比较
+
+    单源算法对每个起点、点对点算法对每个点对各调用一次, 拼成最短路矩阵后比较
+
+    Args:
+        algorithm (str): codes.registry.ALGORITHMS中的算法名
+        data (dict): iterTestCases生成的用例
+
+    Returns:
+        dict: 'status'('ok', 'error'或算法不适用于该图时的'skipped'), 'correct'(无参考矩阵或出错时为None), 'time'(秒, 只含算法本身),
+            'peak_rss'(进程峰值常驻内存相对用例开始时的增量, 字节; fork继承的父进程内存不计入), 'stats'(SearchStats.asDict()),
+            出错时另含'error'
+    """
+    function, mode = ALGORITHMS[algorithm][:2]
+    record = {'status': 'ok', 'correct': None, 'time': None}
+    stats = SearchStats()
+    # fork得到的子进程继承父进程的峰值常驻内存, 只记录其增量; Linux上ru_maxrss的单位为KB
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        G = CompactGraph.fromNodeLink(data['graph'])
+        expected = _parseMatrix(data['shortest_path_matrix'])
+        # 与tests/benchmark.py相同, 无参考矩阵的用例视为含负权重环
+        if not isApplicable(algorithm, G, expected is None):
+            record['status'] = 'skipped'
+            return dict(record, peak_rss=0, stats=stats.asDict())
+        start = time.perf_counter()
+        if mode == 'all_pairs':
+            dist = function(G, stats=stats)
+        elif mode == 'batch':
+            dist = function([G], stats=stats)[0]
+        elif mode == 'single_source':
+            dist = np.array([function(G, s, stats=stats) for s in range(G.n)]).reshape(G.n, G.n)
+        else:
+            query = function(G)
+            dist = np.array([[query(s, t, stats=stats) for t in range(G.n)] for s in range(G.n)]).reshape(G.n, G.n)
+        record['time'] = time.perf_counter() - start
+        if np.issubdtype(dist.dtype, np.integer):
+            # 整数类型的结果(如Dial)以np.iinfo(dtype).max表示不可达
+            dist = np.where(dist == np.iinfo(dist.dtype).max, np.inf, dist)
+        if expected is not None:
+            record['correct'] = matrixEqual(dist, expected)
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f'{type(e).__name__}: {e}'
+    record['peak_rss'] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) * 1024
+    record['stats'] = stats.asDict()
+    return record
+
+def _worker(algorithm : str, data : dict, connection) -> None:
+    """子进程入口: 运行单个用例并通过管道返回结果"""
+    connection.send(runCase(algorithm, data))
+    connection.close()
+
+def loadCheckpoint(outputPath : str) -> set:
+    """读取已有的结果文件, 返回已完成用例的(文件, 下标, 算法)集合
+
+    中断时最后一行可能只写了一半, 这样的行被丢弃, 文件按有效行重写
+
+    Args:
+        outputPath (str): JSON Lines结果文件
+
+    Returns:
+        set: 已完成的用例
+    """
+    if not os.path.isfile(outputPath):
+        return set()
+    records = []
+    with open(outputPath, 'r') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    with open(outputPath, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return {(record['file'], record['index'], record['algorithm']) for record in records}
+
+def runSuite(algorithm : str, patterns : list, outputPath : str, workers : int = None, timeout : float = None,
+             resume : bool = False) -> list:
+    """对匹配patterns的所有测试用例文件运行算法, 每个用例的结果作为一行写入outputPath
+
+    用例逐个从文件流式读取, 每个用例在单独的子进程中运行, 同时运行的子进程不超过workers个,
+    超时的子进程被终止; 每写完一行即刷新文件, 中断后以resume=True重新运行时跳过已完成的用例
+
+    Args:
+        algorithm (str): codes.registry.ALGORITHMS中的算法名
+        patterns (list): 测试用例文件的glob模式列表, 支持**
+        outputPath (str): JSON Lines结果文件
+        workers (int, optional): 并行的子进程数. Defaults to None, 即CPU核数.
+        timeout (float, optional): 单个用例的时限(秒). Defaults to None, 即不限时.
+        resume (bool, optional): 是否跳过outputPath中已完成的用例并追加写入. Defaults to False.
+
+    Returns:
+        list: 本次写入的结果记录, 每一项含'file', 'index', 'algorithm', 'n', 'm'与runCase的结果
+            (超时为'status': 'timeout', 子进程异常退出为'status': 'error')
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    workers = workers or os.cpu_count() or 1
+    files = sorted(set(os.path.normpath(path) for pattern in patterns for path in glob.glob(pattern, recursive=True)))
+    done = loadCheckpoint(outputPath) if resume else set()
+    context = multiprocessing.get_context('fork')
+
+    def cases():
+        for filePath in files:
+            for index, data in enumerate(iterTestCases(filePath)):
+                if (filePath, index, algorithm) not in done:
+                    yield filePath, index, data
+
+    records = []
+    running = {}
+    pending = cases()
+    with open(outputPath, 'a' if resume else 'w') as output:
+
+        def finish(connection, result):
+            process, record, _ = running.pop(connection)
+            connection.close()
+            process.join()
+            record.update(result)
+            records.append(record)
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+
+        while True:
+            while len(running) < workers:
+                case = next(pending, None)
+                if case is None:
+                    break
+                filePath, index, data = case
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_worker, args=(algorithm, data, sender), daemon=True)
+                process.start()
+                sender.close()
+                record = {'file': filePath, 'index': index, 'algorithm': algorithm,
+                          'n': len(data['graph']['nodes']), 'm': len(data['graph'].get('links', data['graph'].get('edges', [])))}
+                running[receiver] = (process, record, None if timeout is None else time.monotonic() + timeout)
+            if not running:
+                break
+            deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+            remaining = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            for connection in wait(list(running), timeout=remaining):
+                try:
+                    result = connection.recv()
+                except EOFError:
+                    result = {'status': 'error', 'correct': None, 'time': None,
+                              'error': f'worker exited with code {running[connection][0].exitcode}'}
+                finish(connection, result)
+            now = time.monotonic()
+            for connection in [c for c, (_, _, deadline) in running.items() if deadline is not None and deadline <= now]:
+                running[connection][0].kill()
+                finish(connection, {'status': 'timeout', 'correct': None, 'time': timeout})
+    return records
+
+def main(argv : list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m codes', description='Run a shortest-path algorithm over test-case files')
+    parser.add_argument('algorithm', choices=list(ALGORITHMS))
+    parser.add_argument('patterns', nargs='+', help='glob patterns of test-case JSON files, e.g. "data/sample_test_cases/class*/*.json"')
+    parser.add_argument('--workers', type=int, default=None, help='parallel worker processes (default: CPU count)')
+    parser.add_argument('--timeout', type=float, default=None, help='per-graph time limit in seconds')
+    parser.add_argument('--output', default='run_output.jsonl')
+    parser.add_argument('--resume', action='store_true', help='skip graphs already recorded in --output and append')
+    args = parser.parse_args(argv)
+
+    records = runSuite(args.algorithm, args.patterns, args.output, args.workers, args.timeout, args.resume)
+    statuses = [record['status'] for record in records]
+    wrong = sum(1 for record in records if record['correct'] is False)
+    print(f"{len(records)} graphs: {statuses.count('ok')} ok, {wrong} wrong, {statuses.count('error')} errors, "
+          f"{statuses.count('timeout')} timeouts, {statuses.count('skipped')} skipped", file=sys.stderr)
+    return 1 if wrong or statuses.count('error') or statuses.count('timeout') else 0
@@ -0,0 +1,89 @@
+import time
+
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+class SearchStats:
+    """最短路算法的运行统计, 以stats参数传入各算法, 可跨多次调用累加
+
+    算法内部只用局部整数计数, 结束时一次性写入, 不传入stats时不产生额外开销
+
+    Attributes:
+        calls (int): 调用次数
+        relaxAttempts (int): 尝试松弛的边数
+        relaxSuccesses (int): 成功松弛(距离变小)的次数
+        pushes (int): 堆/队列入队次数
+        pops (int): 堆/队列出队次数
+        settled (int): 出堆并确定最短路的点数
+        passes (int): Bellman-Ford的松弛轮数(含最后一轮无变化或负权重环检查的一轮)
+        enqueues (np.ndarray): SPFA中每个点的入队次数, 未运行SPFA时为None
+        timings (dict): 各阶段耗时(秒), 如'build'(构造图/矩阵), 'solve'(求解), 'convert'(转换结果)
+    """
+
+    COUNTERS = ('calls', 'relaxAttempts', 'relaxSuccesses', 'pushes', 'pops', 'settled', 'passes')
+
+    def __init__(self) -> None:
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.enqueues = None
+        self.timings = {}
+
+    def add(self, **counters) -> None:
+        """累加计数器
+
+        Args:
+            **counters: 计数器名与增量, 名称须在COUNTERS中
+        """
+        for name, value in counters.items():
+            if name not in self.COUNTERS:
+                raise ValueError(f"Unknown counter: {name}")
+            setattr(self, name, getattr(self, name) + int(value))
+
+    def addEnqueues(self, enqueues: list) -> None:
+        """累加每个点的入队次数, 点数不同时按较大者补齐"""
+        enqueues = np.asarray(enqueues, dtype=np.int64)
+        if self.enqueues is None:
+            self.enqueues = enqueues.copy()
+            return
+        if len(enqueues) > len(self.enqueues):
+            self.enqueues, enqueues = enqueues.copy(), self.enqueues
+        self.enqueues[:len(enqueues)] += enqueues
+
+    @contextmanager
+    def phase(self, name: str):
+        """计时上下文, 耗时累加到timings[name]"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def merge(self, other: 'SearchStats') -> 'SearchStats':
+        """将other的统计累加到自身
+
+        Args:
+            other (SearchStats): 另一份统计
+
+        Returns:
+            SearchStats: 自身
+        """
+        self.add(**{name: getattr(other, name) for name in self.COUNTERS})
+        if other.enqueues is not None:
+            self.addEnqueues(other.enqueues)
+        for name, seconds in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        return self
+
+    def asDict(self) -> dict:
+        """转换为可JSON序列化的字典, enqueues只保留汇总值"""
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        if self.enqueues is not None:
+            result['reEnqueues'] = int(np.maximum(self.enqueues - 1, 0).sum())
+            result['maxEnqueues'] = int(self.enqueues.max()) if self.enqueues.size > 0 else 0
+        result['timings'] = dict(self.timings)
+        return result
+
+def phaseTimer(stats: SearchStats, name: str):
+    """stats不为None时返回其计时上下文, 否则返回空上下文"""
+    return nullcontext() if stats is None else stats.phase(name)
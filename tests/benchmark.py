@@ -0,0 +1,208 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import tests.test_model as test_model
+
+from codes.compactGraph import CompactGraph
+from codes.registry import ALGORITHMS, isApplicable
+from codes.stats import SearchStats
+from codes.randomGraph import generateRandomEdges
+
+CLASSES = [f'class{i}' for i in range(1, 9)]
+TIERS = ['lite', 'medium', 'large']
+SYNTHETIC_SIZES = [100, 1000, 10000]
+
+def measure(algorithm: str, graphs: list, sources: int = None, memory: bool = True) -> dict:
+    """对一组图运行算法, 记录总耗时、峰值内存与每秒扫描的边数
+
+    Args:
+        algorithm (str): ALGORITHMS中的算法名
+        graphs (list): CompactGraph列表
+        sources (int, optional): 单源算法的起点数量, 起点取0..sources-1; 点对点算法对每个起点s查询到n-1-s的最短路.
+            Defaults to None, 即所有点(点对点算法查询所有点对).
+        memory (bool, optional): 是否另行运行一次并用tracemalloc记录峰值内存. Defaults to True.
+
+    Returns:
+        dict: 'time'(秒), 'peak_memory'(字节, 未记录时为None), 'edges_per_second'(每秒尝试松弛的边数), 'stats'(SearchStats.asDict())
+    """
+    function, mode = ALGORITHMS[algorithm][:2]
+
+    def run(stats=None):
+        if mode == 'batch':
+            function(graphs, stats=stats)
+            return
+        for G in graphs:
+            if mode == 'all_pairs':
+                function(G, stats=stats)
+                continue
+            query = function(G) if mode == 'point_to_point' else None
+            for s in range(G.n if sources is None else min(sources, G.n)):
+                if mode == 'single_source':
+                    function(G, s, stats=stats)
+                    continue
+                for t in (range(G.n) if sources is None else [G.n - 1 - s]):
+                    query(s, t, stats=stats)
+
+    stats = SearchStats()
+    start = time.perf_counter()
+    run(stats)
+    elapsed = time.perf_counter() - start
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        'time': elapsed,
+        'peak_memory': peak_memory,
+        'edges_per_second': stats.relaxAttempts / elapsed if elapsed > 0 else None,
+        'stats': stats.asDict()
+    }
+
+def synthetic_graph(n: int, negative: bool, seed: int = 6010) -> CompactGraph:
+    """生成平均出度为5的稀疏有向图; negative为True时按势函数构造含负权重边、无负权重环的图
+
+    Args:
+        n (int): 点数
+        negative (bool): 是否含负权重边
+        seed (int, optional): 随机种子. Defaults to 6010.
+
+    Returns:
+        CompactGraph: 随机图
+    """
+    rng = np.random.default_rng(seed)
+    src, dst, weight = generateRandomEdges(n, edges=5 * n, directed=True, weightRange=(0, 100), seed=rng)
+    if negative:
+        potential = rng.integers(0, 51, size=n)
+        weight = weight // 2 + potential[src] - potential[dst]
+    return CompactGraph(n, src, dst, weight, directed=True)
+
+def run_benchmark(algorithms: list = None, classes: list = None, tiers: list = None, synthetic_sizes: list = None,
+                  test_cases_root: str = 'data/sample_test_cases', sources: int = 4, apsp_max_nodes: int = 1000,
+                  memory: bool = True) -> list:
+    """在各等价类、各规模的测试集合以及合成大图上运行所有算法
+
+    Args:
+        algorithms (list, optional): 算法名列表. Defaults to None, 即ALGORITHMS中的全部算法.
+        classes (list, optional): 等价类列表. Defaults to None, 即class1~class8.
+        tiers (list, optional): 规模列表. Defaults to None, 即lite/medium/large.
+        synthetic_sizes (list, optional): 合成图的点数列表. Defaults to None, 即SYNTHETIC_SIZES.
+        test_cases_root (str, optional): 测试集合根目录. Defaults to 'data/sample_test_cases'.
+        sources (int, optional): 合成图上单源算法的起点数量. Defaults to 4.
+        apsp_max_nodes (int, optional): 合成图上全源算法的最大点数. Defaults to 1000.
+        memory (bool, optional): 是否记录峰值内存. Defaults to True.
+
+    Returns:
+        list: 结果记录列表, 每一项含'algorithm', 'suite', 'n', 'm'与measure的结果
+    """
+    algorithms = list(ALGORITHMS) if algorithms is None else algorithms
+    classes = CLASSES if classes is None else classes
+    tiers = TIERS if tiers is None else tiers
+    synthetic_sizes = SYNTHETIC_SIZES if synthetic_sizes is None else synthetic_sizes
+    results = []
+
+    for case_type in classes:
+        for tier in tiers:
+            for file_path in sorted(glob.glob(f'{test_cases_root}/{case_type}/{tier}_{case_type}_test_cases*.json')):
+                data_list = test_model.load_graph_list_from_json(file_path)
+                suite = os.path.relpath(file_path, test_cases_root)
+                for algorithm in algorithms:
+                    graphs = [data['compact_graph'] for data in data_list
+                              if isApplicable(algorithm, data['compact_graph'], data['shortest_path_matrix'] is None)]
+                    if not graphs:
+                        continue
+                    record = {'algorithm': algorithm, 'suite': suite, 'n': max(len(G) for G in graphs),
+                              'm': sum(G.numberOfEdges for G in graphs)}
+                    record.update(measure(algorithm, graphs, memory=memory))
+                    results.append(record)
+
+    for n in synthetic_sizes:
+        for negative in [False, True]:
+            G = synthetic_graph(n, negative)
+            for algorithm in algorithms:
+                if not isApplicable(algorithm, G, False) or (ALGORITHMS[algorithm][1] in ('all_pairs', 'batch') and n > apsp_max_nodes):
+                    continue
+                record = {'algorithm': algorithm, 'suite': f'synthetic_{"negative" if negative else "non_negative"}',
+                          'n': n, 'm': G.numberOfEdges}
+                record.update(measure(algorithm, [G], sources=sources, memory=memory))
+                results.append(record)
+    return results
+
+def fit_scaling(results: list) -> dict:
+    """对合成图上的结果按log(time) = a * log(n) + b拟合每个算法的规模曲线
+
+    Args:
+        results (list): run_benchmark的结果
+
+    Returns:
+        dict: 算法名 -> {'exponent': a, 'coefficient': e^b}, 只包含至少有两种规模的算法
+    """
+    curves = {}
+    for algorithm in sorted(set(record['algorithm'] for record in results)):
+        points = [(record['n'], record['time']) for record in results
+                  if record['algorithm'] == algorithm and record['suite'].startswith('synthetic') and record['time'] > 0]
+        if len(set(n for n, _ in points)) < 2:
+            continue
+        exponent, intercept = np.polyfit(np.log([n for n, _ in points]), np.log([t for _, t in points]), 1)
+        curves[algorithm] = {'exponent': float(exponent), 'coefficient': float(np.exp(intercept))}
+    return curves
+
+def compare_with_baseline(results: list, baseline: list, threshold: float = 0.25) -> list:
+    """与基准结果比较, 找出耗时超过基准(1 + threshold)倍的记录
+
+    Args:
+        results (list): 本次结果
+        baseline (list): 基准结果
+        threshold (float, optional): 允许的相对变慢比例. Defaults to 0.25.
+
+    Returns:
+        list: 退化记录, 每一项含'algorithm', 'suite', 'n', 'time', 'baseline_time'
+    """
+    baseline_time = {(record['algorithm'], record['suite'], record['n']): record['time'] for record in baseline}
+    regressions = []
+    for record in results:
+        key = (record['algorithm'], record['suite'], record['n'])
+        if key in baseline_time and record['time'] > baseline_time[key] * (1 + threshold):
+            regressions.append({'algorithm': record['algorithm'], 'suite': record['suite'], 'n': record['n'],
+                                'time': record['time'], 'baseline_time': baseline_time[key]})
+    return regressions
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Shortest-path benchmark over all graph classes and scale tiers')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS))
+    parser.add_argument('--classes', nargs='+', choices=CLASSES)
+    parser.add_argument('--tiers', nargs='+', choices=TIERS)
+    parser.add_argument('--sizes', nargs='*', type=int, help='synthetic graph sizes')
+    parser.add_argument('--sources', type=int, default=4, help='sources per single-source run on synthetic graphs')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline', help='baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.algorithms, args.classes, args.tiers, args.sizes, sources=args.sources, memory=not args.no_memory)
+    report = {'results': results, 'scaling': fit_scaling(results)}
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_with_baseline(results, json.load(f)['results'], args.threshold)
+        report['regressions'] = regressions
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for regression in regressions:
+        print(f"REGRESSION {regression['algorithm']} {regression['suite']} n={regression['n']}: "
+              f"{regression['time']:.4f}s > {regression['baseline_time']:.4f}s", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,231 +1,375 @@
 import random
 import os
+import json
+
+from concurrent.futures import ProcessPoolExecutor
 
 import networkx as nx
+import numpy as np
 import tests.test_model as test_model
 
+from codes.algorithm import BellmanFoldSPFA, NegativeCycleError
+from codes.compactGraph import CompactGraph
+from codes.randomGraph import generateRandomEdges
+
 from typing import Union
 
-def generate_class1_random_graph(n: int, temperature: float, directed: bool = False) -> Union[nx.Graph, nx.DiGraph]:
+def _random_graph(n: int, rng: random.Random, temperature: float = None, edges: int = None, directed: bool = False,
+                  weightRange: tuple = (0, 100), potential: bool = False) -> Union[nx.Graph, nx.DiGraph]:
+    """用generateRandomEdges向量化生成G(n,p)或G(n,m)随机图, 再由CompactGraph.toNetworkx转换为networkx图
+
+    Args:
+        n (int): 点数
+        rng (random.Random): 随机数生成器, 或random模块本身; 由它派生NumPy生成器的种子
+        temperature (float, optional): G(n,p)的边概率, 与edges二选一. Defaults to None.
+        edges (int, optional): G(n,m)的边数. Defaults to None.
+        directed (bool, optional): 是否有向图. Defaults to False.
+        weightRange (tuple, optional): 整数边权重的闭区间. Defaults to (0, 100).
+        potential (bool, optional): 是否按_potential_weights构造不含负权重环的边权重, 此时忽略weightRange. Defaults to False.
+
+    Returns:
+        Union[nx.Graph, nx.DiGraph]: 随机图, 点为0..n-1, 边权重为int
+    """
+    seed = np.random.default_rng(rng.getrandbits(64))
+    src, dst, weight = generateRandomEdges(n, temperature, edges, directed, weightRange, seed)
+    if potential:
+        weight = _potential_weights(n, src, dst, seed)
+    return CompactGraph(n, src, dst, weight, directed).toNetworkx()
+
+def _potential_weights(n: int, src: np.ndarray, dst: np.ndarray, seed: np.random.Generator) -> np.ndarray:
+    """按势函数为有向图生成边权重, 构造上不含负权重环
+
+    取势p(v)属于$[0,50]$, 非负权重w'(u,v)属于$[0, 50-(p(u)-p(v))]$, 令w(u,v) = w'(u,v) + p(u) - p(v),
+    则w(u,v)属于$[-50,50]$, 且任意环上p(u) - p(v)项相互抵消, 环的权重和等于w'之和, 非负
+
+    Args:
+        n (int): 点数
+        src (np.ndarray): 边起点数组
+        dst (np.ndarray): 边终点数组
+        seed (np.random.Generator): 随机数生成器
+
+    Returns:
+        np.ndarray: 边权重数组
+    """
+    potential = seed.integers(0, 51, size=n)
+    difference = potential[src] - potential[dst]
+    return seed.integers(0, 51 - difference) + difference
+
+def _check_method(method: str) -> None:
+    """检查含负权重边等价类保证无负权重环的方式"""
+    if method not in ('repair', 'potential'):
+        raise ValueError(f"Invalid method: {method}, should be 'repair' or 'potential'")
+
+def _repair_negative_cycles(G: nx.DiGraph, rng: random.Random) -> None:
+    """反复找出一个负权重环, 将环上一条随机的负权重边改为非负权重, 直到图中不含负权重环
+
+    每轮以带虚拟源点的SPFA给出负权重环作为见证, 至多修正负权重边数轮, 但每轮仍需O(VE)
+
+    Args:
+        G (nx.DiGraph): 输入有向图, 原地修改weight属性
+        rng (random.Random): 随机数生成器
+    """
+    nodes = list(G.nodes())
+    index = {v: i for i, v in enumerate(nodes)}
+    n = len(nodes)
+    while True:
+        edges = list(G.edges(data='weight'))
+        src = [index[u] for u, _, _ in edges] + [n] * n
+        dst = [index[v] for _, v, _ in edges] + list(range(n))
+        weight = [w for _, _, w in edges] + [0] * n
+        try:
+            BellmanFoldSPFA(CompactGraph(n + 1, src, dst, weight, directed=True), n)
+            return
+        except NegativeCycleError as e:
+            cycle = [nodes[i] for i in e.cycle]
+        (u, v) = rng.choice([(u, v) for u, v in zip(cycle, cycle[1:] + cycle[:1]) if G[u][v]['weight'] < 0])
+        G[u][v]['weight'] = rng.randint(0, 50)
+
+def generate_class1_random_graph(n: int, temperature: float, directed: bool = False, rng: random.Random = None) -> Union[nx.Graph, nx.DiGraph]:
     """生成等价类1：非负边权重图（含有向图&无向图，边权重$[0,100]$）
 
     Args:
         n (int): 点数
         temperature (float): 生成图的边概率
         directed (bool, optional): 是否有向图. Defaults to False.
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
 
     Returns:
         nx.Graph: 随机生成等价类1的图
     """
-    G = nx.erdos_renyi_graph(n, temperature, directed=directed)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(0, 100)
-    return G
+    rng = random if rng is None else rng
+    return _random_graph(n, rng, temperature=temperature, directed=directed)
 
-def generate_class2_random_graph(n: int, temperature: float) -> nx.DiGraph:
+def generate_class2_random_graph(n: int, temperature: float, rng: random.Random = None, method: str = 'repair') -> nx.DiGraph:
     """生成等价类2：含负边权重图（含负权重边的有向图，边权重$[-50,50]$，无负权重环）
 
     Args:
         n (int): 点数
         temperature (float): 生成图的边概率
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
+        method (str, optional): 保证无负权重环的方式, 见_repair_negative_cycles与_potential_weights;
+            'repair'每轮需O(VE); 边概率较小时'potential'能在数秒内生成上万个点的图. Defaults to 'repair'.
 
     Returns:
         nx.DiGraph: 随机生成等价类2的图
     """
-    G = nx.erdos_renyi_graph(n, temperature, directed=True)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(-50, 50)
-    while test_model.check_negative_cycle(G):
-        (u, v, weight) = random.choice([(u, v, data['weight']) for u, v, data in G.edges(data=True) if data['weight'] < 0])
-        G[u][v]['weight'] = random.randint(0, 50)
+    _check_method(method)
+    rng = random if rng is None else rng
+    G = _random_graph(n, rng, temperature=temperature, directed=True, weightRange=(-50, 50), potential=method == 'potential')
+    if method == 'repair':
+        _repair_negative_cycles(G, rng)
     return G
 
-def generate_class3_random_graph(n: int, directed: bool = False) -> Union[nx.Graph, nx.DiGraph]:
+def generate_class3_random_graph(n: int, directed: bool = False, rng: random.Random = None) -> Union[nx.Graph, nx.DiGraph]:
     """生成等价类3：非负边权重稀疏图（含有向图&无向图，边权重$[0,100]$，$|E| < 5\cdot|V|$）
 
     Args:
         n (int): 点数
         directed (bool, optional): 是否有向图. Defaults to False.
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
 
     Returns:
         nx.Graph: 随机生成等价类3的图
     """
-    m = random.randint(5, 30) * n // 10
-    G = nx.gnm_random_graph(n, m, directed=directed)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(0, 100)
-    return G
+    rng = random if rng is None else rng
+    m = rng.randint(5, 30) * n // 10
+    return _random_graph(n, rng, edges=m, directed=directed)
 
-def generate_class4_random_graph(n: int, directed: bool = False) -> Union[nx.Graph, nx.DiGraph]:
+def generate_class4_random_graph(n: int, directed: bool = False, rng: random.Random = None) -> Union[nx.Graph, nx.DiGraph]:
     """生成等价类4: 非负边权重稠密图（含有向图&无向图，边权重$[0,100]$，$|E| > 0.5\cdot|V|^2$）
 
     Args:
         n (int): 点数
         directed (bool, optional): 是否有向图. Defaults to False.
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
 
     Returns:
         nx.Graph: 随机生成等价类4的图
     """
-    m = random.randint(n * n // 2, n * n)
-    G = nx.gnm_random_graph(n, m, directed=directed)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(0, 100)
-    return G
+    rng = random if rng is None else rng
+    m = rng.randint(n * n // 2, n * n)
+    return _random_graph(n, rng, edges=m, directed=directed)
 
-def generate_class5_random_graph(n: int) -> nx.DiGraph:
+def generate_class5_random_graph(n: int, rng: random.Random = None, method: str = 'repair') -> nx.DiGraph:
     """生成等价类5: 含负边权重稀疏图（含负权重边有向图，边权重$[-50,50]$，$|E| < 5\cdot|V|$，无负权重环）
 
     Args:
         n (int): 点数
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
+        method (str, optional): 保证无负权重环的方式, 见_repair_negative_cycles与_potential_weights;
+            'repair'每轮需O(VE); 'potential'能在数秒内生成上万个点的图. Defaults to 'repair'.
 
     Returns:
         nx.DiGraph: 随机生成等价类5的图
     """
-    m = random.randint(5, 30) * n // 10
-    G = nx.gnm_random_graph(n, m, directed=True)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(-50, 50)
-    while test_model.check_negative_cycle(G):
-        (u, v, weight) = random.choice([(u, v, data['weight']) for u, v, data in G.edges(data=True) if data['weight'] < 0])
-        G[u][v]['weight'] = random.randint(0, 50)
+    _check_method(method)
+    rng = random if rng is None else rng
+    m = rng.randint(5, 30) * n // 10
+    G = _random_graph(n, rng, edges=m, directed=True, weightRange=(-50, 50), potential=method == 'potential')
+    if method == 'repair':
+        _repair_negative_cycles(G, rng)
     return G
 
-def generate_class6_random_graph(n: int) -> nx.DiGraph:
+def generate_class6_random_graph(n: int, rng: random.Random = None, method: str = 'repair') -> nx.DiGraph:
     """生成等价类6: 含负边权重稠密图（含负权重边有向图，边权重$[-50,50]$，$|E| > 0.5\cdot|V|^2$，无负权重环）
 
     Args:
         n (int): 点数
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
+        method (str, optional): 保证无负权重环的方式, 见_repair_negative_cycles与_potential_weights;
+            'repair'每轮需O(VE); 'potential'省去负权重环检测, 但图有O(V^2)条边且要构造networkx图,
+            约1500个点即需数秒. Defaults to 'repair'.
 
     Returns:
         nx.DiGraph: 随机生成等价类6的图
     """
-    m = random.randint(n * n // 2, n * n)
-    G = nx.gnm_random_graph(n, m, directed=True)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(-50, 50)
-    while test_model.check_negative_cycle(G):
-        (u, v, weight) = random.choice([(u, v, data['weight']) for u, v, data in G.edges(data=True) if data['weight'] < 0])
-        G[u][v]['weight'] = random.randint(0, 50)
+    _check_method(method)
+    rng = random if rng is None else rng
+    m = rng.randint(n * n // 2, n * n)
+    G = _random_graph(n, rng, edges=m, directed=True, weightRange=(-50, 50), potential=method == 'potential')
+    if method == 'repair':
+        _repair_negative_cycles(G, rng)
     return G
 
-def generate_class7_random_graph(n: int, temperature: float, directed: bool = False ) -> Union[nx.Graph, nx.DiGraph]:
+def generate_class7_random_graph(n: int, temperature: float, directed: bool = False, rng: random.Random = None) -> Union[nx.Graph, nx.DiGraph]:
     """生成等价类7: 负权重环图（含有向图&无向图，边权重$[-50,50]$且至少有向图有一个负权重环, 无向图至少含有一条负权重边）
 
     Args:
         n (int): 点数
         temperature (float): 生成图的边概率
         directed (bool, optional): 是否有向图. Defaults to False.
+        rng (random.Random, optional): 随机数生成器. Defaults to None, 即使用全局random.
 
     Returns:
         nx.DiGraph: 随机生成等价类7的图
     """
-    G = nx.erdos_renyi_graph(n, temperature, directed=directed)
-    for (u, v) in G.edges():
-        G[u][v]['weight'] = random.randint(-50, 50)
+    rng = random if rng is None else rng
+    G = _random_graph(n, rng, temperature=temperature, directed=directed, weightRange=(-50, 50))
     while not test_model.check_negative_cycle(G):
-        (u, v, weight) = random.choice([(u, v, data['weight']) for u, v, data in G.edges(data=True) if data['weight'] >= 0])
-        G[u][v]['weight'] = random.randint(-50, -1)
+        (u, v, weight) = rng.choice([(u, v, data['weight']) for u, v, data in G.edges(data=True) if data['weight'] >= 0])
+        G[u][v]['weight'] = rng.randint(-50, -1)
     return G
 
-def generate_test_cases(case_type: str = 'class1', num: int = 10):
+GRAPH_GENERATORS = {
+    'class1': generate_class1_random_graph,
+    'class2': generate_class2_random_graph,
+    'class3': generate_class3_random_graph,
+    'class4': generate_class4_random_graph,
+    'class5': generate_class5_random_graph,
+    'class6': generate_class6_random_graph,
+    'class7': generate_class7_random_graph,
+}
+
+def plan_test_cases(case_type: str, num: int, rng: random.Random) -> tuple:
+    """确定测试集合中每个图的等价类与生成参数, 不实际生成图
+
+    Args:
+        case_type (str): 等价类, class1~class8
+        num (int): 图的数量
+        rng (random.Random): 随机数生成器
 
+    Returns:
+        tuple: (计划列表, 用于确定规模的num), 计划列表的每一项为(等价类, 生成函数参数)
+    """
     valid_case_types = [f'class{i}' for i in range(1, 9)]
-    test_cases = []
+    plan = []
 
     if case_type not in valid_case_types:
         raise ValueError(f"Invalid case type: {case_type}")
     elif case_type == 'class1':
         for i in range(num):
-            n = random.randint(5, 30)
-            temperature = random.random()
+            n = rng.randint(5, 30)
+            temperature = rng.random()
             temperature = 1.0 if temperature == 0 else temperature
-            directed = random.choice([True, False])
-            G = generate_class1_random_graph(n, temperature, directed)
-            test_cases.append(G)
+            directed = rng.choice([True, False])
+            plan.append(('class1', (n, temperature, directed)))
     elif case_type == 'class2':
         for i in range(num):
-            n = random.randint(5, 30)
-            temperature = random.random()
+            n = rng.randint(5, 30)
+            temperature = rng.random()
             temperature = 1.0 if temperature == 0 else temperature
-            G = generate_class2_random_graph(n, temperature)
-            test_cases.append(G)
+            plan.append(('class2', (n, temperature)))
     elif case_type == 'class3':
         for i in range(num):
-            n = random.randint(5, 30)
-            directed = random.choice([True, False])
-            G = generate_class3_random_graph(n, directed)
-            test_cases.append(G)
+            n = rng.randint(5, 30)
+            directed = rng.choice([True, False])
+            plan.append(('class3', (n, directed)))
     elif case_type == 'class4':
         for i in range(num):
-            n = random.randint(5, 20)
-            directed = random.choice([True, False])
-            G = generate_class4_random_graph(n, directed)
-            test_cases.append(G)
+            n = rng.randint(5, 20)
+            directed = rng.choice([True, False])
+            plan.append(('class4', (n, directed)))
     elif case_type == 'class5':
         for i in range(num):
-            n = random.randint(5, 30)
-            G = generate_class5_random_graph(n)
-            test_cases.append(G)
+            n = rng.randint(5, 30)
+            plan.append(('class5', (n,)))
     elif case_type == 'class6':
         for i in range(num):
-            n = random.randint(5, 30)
-            G = generate_class6_random_graph(n)
-            test_cases.append(G)
+            n = rng.randint(5, 30)
+            plan.append(('class6', (n,)))
     elif case_type == 'class7':
         for i in range(num):
-            n = random.randint(5, 30)
-            temperature = random.random()
+            n = rng.randint(5, 30)
+            temperature = rng.random()
             temperature = 1.0 if temperature == 0 else temperature
-            directed = random.choice([True, False])
-            G = generate_class7_random_graph(n, temperature, directed)
-            test_cases.append(G)
+            directed = rng.choice([True, False])
+            plan.append(('class7', (n, temperature, directed)))
     elif case_type == 'class8':
 
         case7Num = max(num//10, 1) 
         num = max(num-case7Num, 0)
         for i in range(case7Num):
-            n = random.randint(5, 30)
-            temperature = random.random()
+            n = rng.randint(5, 30)
+            temperature = rng.random()
             temperature = 1.0 if temperature == 0 else temperature
-            directed = random.choice([True, False])
-            G = generate_class7_random_graph(n, temperature, directed)
-            test_cases.append(G)
+            directed = rng.choice([True, False])
+            plan.append(('class7', (n, temperature, directed)))
 
-        case6Num =random.randint(1, max((num * 2) // 4, 1))
+        case6Num =rng.randint(1, max((num * 2) // 4, 1))
         num = max(num-case6Num, 0)
         for i in range(case6Num):
-            n = random.randint(5, 30)
-            G = generate_class6_random_graph(n)
-            test_cases.append(G) 
+            n = rng.randint(5, 30)
+            plan.append(('class6', (n,)))
 
-        case5Num = random.randint(1, max((num * 2) // 3, 1))
+        case5Num = rng.randint(1, max((num * 2) // 3, 1))
         num = max(num-case5Num, 0)
         for i in range(num):
-            n = random.randint(5, 30)
-            G = generate_class5_random_graph(n)
-            test_cases.append(G)
+            n = rng.randint(5, 30)
+            plan.append(('class5', (n,)))
 
-        case4Num = random.randint(1, max(num - 1, 1))
+        case4Num = rng.randint(1, max(num - 1, 1))
         num = max(num-case4Num, 0)
         for i in range(case4Num):
-            n = random.randint(5, 20)
-            directed = random.choice([True, False])
-            G = generate_class4_random_graph(n, directed)
-            test_cases.append(G)
+            n = rng.randint(5, 20)
+            directed = rng.choice([True, False])
+            plan.append(('class4', (n, directed)))
         
         case3Num = max(1, num)
         for i in range(case3Num):
-            n = random.randint(5, 30)
-            directed = random.choice([True, False])
-            G = generate_class3_random_graph(n, directed)
-            test_cases.append(G)
+            n = rng.randint(5, 30)
+            directed = rng.choice([True, False])
+            plan.append(('class3', (n, directed)))
+    return plan, num
+
+def generate_test_case(task: tuple) -> str:
+    """按计划生成一个图并计算最短路矩阵, 返回其JSON文本, 供进程池调用
+
+    Args:
+        task (tuple): (等价类, 生成函数参数, 生成函数关键字参数, 该图的随机种子)
+
+    Returns:
+        str: 该测试用例的JSON文本
+    """
+    case_type, args, kwargs, seed = task
+    G = GRAPH_GENERATORS[case_type](*args, rng=random.Random(seed), **kwargs)
+    return json.dumps(test_model.graph_to_test_case(G))
+
+def generate_test_cases(case_type: str = 'class1', num: int = 10, seed: int = None, workers: int = 1,
+                        output_directory: str = 'data/sample_test_cases', method: str = 'repair') -> str:
+    """生成测试集合并保存为JSON文件
+
+    由主种子依次派生每个图的种子, 图与最短路矩阵在进程池中生成, 并按顺序流式写入文件;
+    给定seed时输出文件与workers无关, 逐字节一致
+
+    Args:
+        case_type (str, optional): 等价类, class1~class8. Defaults to 'class1'.
+        num (int, optional): 图的数量. Defaults to 10.
+        seed (int, optional): 主种子. Defaults to None, 即由全局random产生.
+        workers (int, optional): 进程数, 为1时在当前进程生成. Defaults to 1.
+        output_directory (str, optional): 测试集合根目录. Defaults to 'data/sample_test_cases'.
+        method (str, optional): 含负权重边等价类(2/5/6)保证无负权重环的方式, 见generate_class2_random_graph. Defaults to 'repair'.
+
+    Returns:
+        str: 保存的文件路径
+    """
+    _check_method(method)
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+    plan, num = plan_test_cases(case_type, num, rng)
+    tasks = [(graph_case_type, args, {'method': method} if graph_case_type in ('class2', 'class5', 'class6') else {}, rng.getrandbits(64))
+             for graph_case_type, args in plan]
 
     # 保存测试用例
-    os.makedirs(f'data/sample_test_cases/{case_type}', exist_ok=True)
+    os.makedirs(f'{output_directory}/{case_type}', exist_ok=True)
     scale = "lite" if num <= 10 else "medium"
     scale = "large" if num >= 50 else scale
     count = 0
-    for fileName in os.listdir(f'data/sample_test_cases/{case_type}'):
+    for fileName in os.listdir(f'{output_directory}/{case_type}'):
         if fileName.startswith(f'{scale}_{case_type}_test_cases'):
             count += 1
-    test_model.save_graph_list_to_json(test_cases, f'data/sample_test_cases/{case_type}/{scale}_{case_type}_test_cases{count+1}.json')
\ No newline at end of file
+    file_path = f'{output_directory}/{case_type}/{scale}_{case_type}_test_cases{count+1}.json'
+    with open(file_path, 'w') as f:
+        f.write('[')
+        if workers <= 1:
+            _write_test_cases(f, map(generate_test_case, tasks))
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                _write_test_cases(f, executor.map(generate_test_case, tasks, chunksize=max(len(tasks) // (workers * 4), 1)))
+        f.write(']')
+    return file_path
+
+def _write_test_cases(f, cases) -> None:
+    """按顺序写入测试用例的JSON文本, 格式与json.dump(list)一致"""
+    for i, case in enumerate(cases):
+        if i > 0:
+            f.write(', ')
+        f.write(case)
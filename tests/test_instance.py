@@ -1,12 +1,30 @@
+import json
+import os
+import random
+import time
+
+import graphviz
 import pytest
 
 import networkx as nx
 import numpy as np
 
+import codes.algorithm as algorithm
+import codes.ioProcess as ioProcess
+import codes.runner as runner
+import tests.benchmark as bm
 import tests.test_cases as tc
 import tests.test_model as tm
 
-from codes.algorithm import Floyd, Floyd2
+from codes.algorithm import Floyd, Floyd2, FloydBatch, FloydBlocked, Dijsktra, Dial, BellmanFord, BellmanFoldSPFA, Johnson, NegativeCycleError
+from codes.cache import DistanceCache
+from codes.compactGraph import CompactGraph
+from codes.dynamic import DynamicAPSP
+from codes.packed import PackedSymmetricMatrix
+from codes.path import iterNextHop, nextHopDtype, reconstructPath
+from codes.pointToPoint import BidirectionalDijkstra, LandmarkIndex
+from codes.randomGraph import generateRandomEdges, generateRandomCompactGraph
+from codes.stats import SearchStats
 i = 0
 def sampleFloydTestCases(graph: nx.Graph, start: int, end: int) -> float:
     global i
@@ -35,6 +53,628 @@ def test_Floyd():
 
     test_instance.random_test(sampleFloydTestCases, 10)
 
+def sampleFloydBatchTestCases(graph: CompactGraph, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    return Floyd(graph)[sources, targets]
+
+def test_random_test_modes():
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class3/medium_class3_test_cases1.json')
+    test_instance.random_test(sampleFloydBatchTestCases, 50)
+    test_instance.random_test(Dijsktra, 50)
+    test_instance.random_test(BellmanFord, 50)
+
+    with pytest.raises(ValueError, match="single-source test_algorithm should return np.ndarray"):
+        def wrong_single_source_algorithm(G: nx.Graph, start: int) -> float:
+            return 0.0
+        test_instance.random_test(wrong_single_source_algorithm)
+    with pytest.raises(ValueError, match="test_algorithm parameter type error"):
+        def wrong_batch_algorithm(G: nx.Graph, sources: int, targets: int) -> np.ndarray:
+            return np.zeros(len(sources))
+        test_instance.random_test(wrong_batch_algorithm)
+    with pytest.raises(AssertionError, match="shortest paths mismatched"):
+        def wrong_answer_algorithm(G: nx.Graph, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+            return np.full(len(sources), 1e9)
+        test_instance.random_test(wrong_answer_algorithm, 50)
+
+def test_Floyd_dtype():
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class2/lite_class2_test_cases1.json')
+    for test_data in test_instance.test_cases:
+        G = test_data['graph']
+        expected = test_data['shortest_path_matrix']
+        assert np.array_equal(Floyd(G), expected)
+        assert np.array_equal(Floyd(G, dtype=np.float32), expected)
+        dist = Floyd(G, dtype=np.int32)
+        unreachable = dist == np.iinfo(np.int32).max
+        assert np.array_equal(unreachable, np.isinf(expected))
+        assert np.array_equal(dist[~unreachable], expected[~unreachable])
+        if not G.is_directed():
+            assert np.array_equal(Floyd2(G), expected)
+
+def sampleCompactDijkstraTestCases(graph: CompactGraph, start: int, end: int) -> float:
+    return Dijsktra(graph, start, end)[end]
+
+def test_CompactGraph():
+    for test_cases_file, algorithms in [
+        ('data/sample_test_cases/class3/lite_class3_test_cases1.json', [Dijsktra, BellmanFord, BellmanFoldSPFA]),
+        ('data/sample_test_cases/class2/lite_class2_test_cases1.json', [BellmanFord, BellmanFoldSPFA]),
+    ]:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        for test_data in test_instance.test_cases:
+            G = test_data['compact_graph']
+            expected = test_data['shortest_path_matrix']
+            assert len(G) == len(test_data['graph'])
+            assert np.array_equal(Floyd(G), expected)
+            assert np.array_equal(Floyd(CompactGraph.fromNetworkx(test_data['graph'])), expected)
+            for algorithm in algorithms:
+                for s in range(len(G)):
+                    assert np.array_equal(algorithm(G, s), expected[s])
+        if Dijsktra in algorithms:
+            test_instance.random_test(sampleCompactDijkstraTestCases, 10)
+
+def test_Dijkstra():
+    for test_cases_file in ['data/sample_test_cases/class1/lite_class1_test_cases1.json',
+                            'data/sample_test_cases/class3/lite_class3_test_cases2.json']:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        for test_data in test_instance.test_cases:
+            G = test_data['compact_graph']
+            expected = test_data['shortest_path_matrix']
+            for s in range(len(G)):
+                assert np.array_equal(Dijsktra(G, s, heap='pairing'), expected[s])
+                for t in range(len(G)):
+                    assert Dijsktra(G, s, t)[t] == expected[s][t]
+    with pytest.raises(ValueError, match="non-negative"):
+        Dijsktra(CompactGraph(2, [0], [1], [-1.0]), 0)
+    with pytest.raises(ValueError, match="Invalid heap type"):
+        Dijsktra(G, 0, heap='fibonacci')
+
+def test_Dial():
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class3/lite_class3_test_cases1.json')
+    for test_data in test_instance.test_cases:
+        G = test_data['compact_graph']
+        expected = test_data['shortest_path_matrix']
+        for s in range(len(G)):
+            for queue in ['bucket', 'radix']:
+                dist = Dial(G, s, queue=queue)
+                assert dist.dtype == np.int32
+                unreachable = dist == np.iinfo(np.int32).max
+                assert np.array_equal(unreachable, np.isinf(expected[s]))
+                assert np.array_equal(dist[~unreachable], expected[s][~unreachable])
+            for heap in ['auto', 'dial', 'radix']:
+                assert np.array_equal(Dijsktra(G, s, heap=heap), expected[s])
+    with pytest.raises(ValueError, match="non-negative integer"):
+        Dial(CompactGraph(2, [0], [1], [0.5]), 0)
+
+def test_SPFA():
+    for test_cases_file in ['data/sample_test_cases/class2/lite_class2_test_cases2.json',
+                            'data/sample_test_cases/class5/lite_class5_test_cases1.json',
+                            'data/sample_test_cases/class6/lite_class6_test_cases1.json']:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        for test_data in test_instance.test_cases:
+            G = test_data['compact_graph']
+            expected = test_data['shortest_path_matrix']
+            for s in range(len(G)):
+                for slf, lll in [(False, False), (True, False), (False, True), (True, True)]:
+                    assert np.array_equal(BellmanFoldSPFA(G, s, slf=slf, lll=lll), expected[s])
+
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class7/lite_class7_test_cases1.json')
+    for test_data in test_instance.test_cases:
+        G = test_data['graph']
+        with pytest.raises(NegativeCycleError) as excinfo:
+            for s in range(len(G)):
+                BellmanFoldSPFA(test_data['compact_graph'], s, slf=True)
+        cycle = excinfo.value.cycle
+        assert sum(G[u][v]['weight'] for u, v in zip(cycle, cycle[1:] + cycle[:1])) < 0
+
+def test_BellmanFord():
+    for test_cases_file in ['data/sample_test_cases/class5/lite_class5_test_cases2.json',
+                            'data/sample_test_cases/class6/lite_class6_test_cases2.json']:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        for test_data in test_instance.test_cases:
+            for s in range(len(test_data['graph'])):
+                assert np.array_equal(BellmanFord(test_data['compact_graph'], s), test_data['shortest_path_matrix'][s])
+
+    # 1 -> 2 -> 1 为负权重环, 3 只能经过环到达, 4 不受影响, 5 不可达
+    G = nx.DiGraph()
+    G.add_nodes_from(range(6))
+    G.add_weighted_edges_from([(0, 1, 1), (1, 2, -3), (2, 1, 1), (2, 3, 5), (0, 4, 2), (5, 0, 1)])
+    dist = BellmanFord(G, 0)
+    assert np.array_equal(dist, [0, -np.inf, -np.inf, -np.inf, 2, np.inf])
+
+def test_Johnson(monkeypatch):
+    monkeypatch.setattr(algorithm, 'JOHNSON_DENSE_RATIO', 1.0)
+    monkeypatch.setattr(algorithm, 'JOHNSON_PARALLEL_MIN_NODES', 0)
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class5/lite_class5_test_cases3.json')
+    for test_data in test_instance.test_cases:
+        expected = test_data['shortest_path_matrix']
+        assert np.array_equal(Johnson(test_data['compact_graph'], workers=1), expected)
+    assert np.array_equal(Johnson(test_data['compact_graph'], workers=2), expected)
+
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class7/lite_class7_test_cases1.json')
+    for test_data in test_instance.test_cases:
+        with pytest.raises(NegativeCycleError) as excinfo:
+            Johnson(test_data['compact_graph'], workers=1)
+        assert len(excinfo.value.cycle) > 0
+
+    # 弧数超过阈值时改用Floyd, 负权重环同样要抛出
+    monkeypatch.setattr(algorithm, 'JOHNSON_DENSE_RATIO', 0.0)
+    with pytest.raises(NegativeCycleError) as excinfo:
+        Johnson(CompactGraph(3, [0, 1, 2], [1, 2, 0], [1.0, -3.0, 1.0], directed=True))
+    assert sorted(excinfo.value.cycle) == [0, 1, 2]
+    G = CompactGraph(3, [0, 1, 2], [1, 2, 0], [1.0, -1.0, 1.0], directed=True)
+    assert np.array_equal(Johnson(G), Floyd(G))
+
+def test_FloydBatch(tmp_path):
+    graph_list = []
+    for test_cases_file in ['data/sample_test_cases/class1/lite_class1_test_cases2.json',
+                            'data/sample_test_cases/class4/lite_class4_test_cases1.json',
+                            'data/sample_test_cases/class6/lite_class6_test_cases3.json']:
+        data_list = tm.load_graph_list_from_json(test_cases_file)
+        assert tm.verify_shortest_path_matrices(data_list) == []
+        graph_list += [data['graph'] for data in data_list]
+    for dtype in [np.float64, np.int32]:
+        for G, matrix in zip(graph_list, FloydBatch(graph_list, dtype=dtype)):
+            assert np.array_equal(matrix, Floyd(G, dtype=dtype))
+
+    tm.save_graph_list_to_json(graph_list, tmp_path / 'cases.json')
+    data_list = tm.load_graph_list_from_json(tmp_path / 'cases.json')
+    assert tm.verify_shortest_path_matrices(data_list) == []
+    data_list[0]['shortest_path_matrix'][0][-1] += 1
+    assert tm.verify_shortest_path_matrices(data_list) == [0]
+
+def test_binary_test_cases(tmp_path):
+    converted = tm.convert_json_test_cases_to_binary('data/sample_test_cases', tmp_path)
+    assert len(converted) == len(list(tmp_path.glob('class*/*')))
+    for test_cases_file in ['class4/lite_class4_test_cases2', 'class7/lite_class7_test_cases1', 'class8/medium_class8_test_cases1']:
+        json_cases = tm.load_graph_list_from_json(f'data/sample_test_cases/{test_cases_file}.json')
+        binary_cases = tm.load_graph_list_from_binary(tmp_path / test_cases_file)
+        assert len(json_cases) == len(binary_cases)
+        for json_data, binary_data in zip(json_cases, binary_cases):
+            assert nx.utils.graphs_equal(json_data['graph'], binary_data['graph'])
+            if json_data['shortest_path_matrix'] is None:
+                assert binary_data['shortest_path_matrix'] is None
+            else:
+                assert np.array_equal(json_data['shortest_path_matrix'], binary_data['shortest_path_matrix'])
+        assert tm.verify_shortest_path_matrices(binary_cases) == []
+
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file=str(tmp_path / 'class6/large_class6_test_cases1'))
+    assert isinstance(test_instance.test_cases, tm.BinaryTestCases)
+    test_instance.random_test(BellmanFord, 10)
+
+def test_generate_test_cases(tmp_path):
+    for case_type in ['class1', 'class5', 'class8']:
+        serial_file = tc.generate_test_cases(case_type, 12, seed=6010, output_directory=tmp_path / 'serial')
+        parallel_file = tc.generate_test_cases(case_type, 12, seed=6010, workers=3, output_directory=tmp_path / 'parallel')
+        with open(serial_file, 'rb') as f1, open(parallel_file, 'rb') as f2:
+            assert f1.read() == f2.read()
+        data_list = tm.load_graph_list_from_json(parallel_file)
+        assert tm.verify_shortest_path_matrices(data_list) == []
+        with open(parallel_file, 'r') as f:
+            assert json.load(f) == [tm.graph_to_test_case(data['graph']) for data in data_list]
+
+def test_potential_generation(tmp_path):
+    rng = random.Random(6010)
+    for G in [tc.generate_class2_random_graph(40, 0.3, rng=rng, method='potential'),
+              tc.generate_class5_random_graph(40, rng=rng, method='potential'),
+              tc.generate_class6_random_graph(40, rng=rng, method='potential')]:
+        weights = [w for _, _, w in G.edges(data='weight')]
+        assert min(weights) >= -50 and max(weights) <= 50 and min(weights) < 0
+        assert not tm.check_negative_cycle(G)
+    assert G.number_of_edges() > 0.5 * len(G) ** 2
+
+    file_path = tc.generate_test_cases('class6', 20, seed=6010, output_directory=tmp_path, method='potential')
+    data_list = tm.load_graph_list_from_json(file_path)
+    assert all(data['shortest_path_matrix'] is not None for data in data_list)
+    assert tm.verify_shortest_path_matrices(data_list) == []
+
+    for G in [tc.generate_class2_random_graph(40, 0.3, rng=rng), tc.generate_class6_random_graph(20, rng=rng)]:
+        assert not tm.check_negative_cycle(G) and min(w for _, _, w in G.edges(data='weight')) >= -50
+    with pytest.raises(ValueError, match="Invalid method"):
+        tc.generate_class5_random_graph(40, rng=rng, method='potental')
+    with pytest.raises(ValueError, match="Invalid method"):
+        tc.generate_test_cases('class2', 2, seed=6010, output_directory=tmp_path, method='potental')
+
+def test_generate_random_edges():
+    for directed in [False, True]:
+        for temperature, edges in [(0.05, None), (None, 3000), (1.0, None)]:
+            src, dst, weight = generateRandomEdges(300 if temperature != 1.0 else 20, temperature, edges, directed, (0, 100), seed=6010)
+            pairs = set(zip(src.tolist(), dst.tolist()))
+            if not directed:
+                pairs |= set(zip(dst.tolist(), src.tolist()))
+            assert len(pairs) == len(src) * (1 if directed else 2)
+            assert np.all(src != dst) and weight.min() >= 0 and weight.max() <= 100
+        assert len(src) == (380 if directed else 190)
+        assert len(generateRandomEdges(300, edges=3000, directed=directed, seed=6010)[0]) == 3000
+
+    compact_graph = generateRandomCompactGraph(60, temperature=0.1, directed=True, seed=6010)
+    G = compact_graph.toNetworkx()
+    assert G.number_of_edges() == compact_graph.numberOfEdges
+    assert np.array_equal(Floyd(G), Floyd(compact_graph))
+
+def test_benchmark_suite(tmp_path):
+    results = bm.run_benchmark(['Floyd', 'Dijsktra', 'BellmanFord'], ['class1', 'class7'], ['lite'], [50, 100], sources=2)
+    assert {record['algorithm'] for record in results if record['suite'].startswith('class7')} == {'BellmanFord'}
+    assert all(record['time'] > 0 and record['peak_memory'] > 0 for record in results)
+    assert set(bm.fit_scaling(results)) == {'Floyd', 'Dijsktra', 'BellmanFord'}
+
+    slower = [dict(record, time=record['time'] * 2) for record in results]
+    assert bm.compare_with_baseline(results, slower) == []
+    assert len(bm.compare_with_baseline(slower, results)) == len(results)
+
+    with open(tmp_path / 'baseline.json', 'w') as f:
+        json.dump({'results': [dict(record, time=0.0) for record in results]}, f)
+    argv = ['--algorithms', 'Floyd', '--classes', 'class1', '--tiers', 'lite', '--sizes', '--no-memory']
+    assert bm.main(argv + ['--output', str(tmp_path / 'results.json')]) == 0
+    assert bm.main(argv + ['--output', str(tmp_path / 'results.json'), '--baseline', str(tmp_path / 'baseline.json')]) == 1
+
+    results = bm.run_benchmark(None, ['class1'], ['lite'], [50], sources=2, memory=False)
+    assert {record['algorithm'] for record in results} == set(bm.ALGORITHMS)
+    assert all(record['stats']['calls'] > 0 for record in results)
+
+def test_search_stats():
+    G = generateRandomCompactGraph(200, edges=1000, directed=True, weightRange=(1, 10), seed=15)
+    for heap in ['binary', 'pairing', 'dial', 'radix']:
+        stats = SearchStats()
+        dist = Dijsktra(G, 0, heap=heap, stats=stats)
+        assert np.array_equal(dist, Dijsktra(G, 0, heap=heap))
+        assert stats.calls == 1 and stats.settled == np.isfinite(dist).sum()
+        assert stats.relaxAttempts == sum(G.indptr[u + 1] - G.indptr[u] for u in np.flatnonzero(np.isfinite(dist)))
+        assert stats.pops <= stats.pushes and {'build', 'solve', 'convert'} <= set(stats.timings)
+
+    stats = SearchStats()
+    BellmanFoldSPFA(G, 0, slf=True, stats=stats)
+    BellmanFoldSPFA(G, 1, stats=stats)
+    assert stats.calls == 2 and stats.pushes == stats.pops == stats.enqueues.sum()
+    assert stats.asDict()['reEnqueues'] == int(np.maximum(stats.enqueues - 1, 0).sum())
+
+    stats = SearchStats()
+    BellmanFord(G, 0, stats=stats)
+    assert 1 <= stats.passes <= len(G) and stats.relaxAttempts == stats.passes * len(G.indices)
+
+    merged = SearchStats().merge(stats).merge(stats)
+    assert merged.passes == 2 * stats.passes and merged.timings['solve'] == pytest.approx(2 * stats.timings['solve'])
+
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class3/lite_class3_test_cases1.json')
+    test_instance.random_test(Dijsktra, 5)
+    assert test_instance.stats.calls > 0 and test_instance.stats.relaxAttempts > 0
+
+def test_full_test():
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class6')
+    pairs = sum(len(data['graph']) ** 2 for data in test_instance.test_cases if data['shortest_path_matrix'] is not None)
+    assert test_instance.full_test(Floyd) == {'graphs': len(test_instance.test_cases), 'pairs': pairs}
+    assert test_instance.full_test(BellmanFord)['pairs'] == pairs
+
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class3/lite_class3_test_cases1.json')
+    test_instance.full_test(sampleFloydBatchTestCases)
+    test_instance.full_test(sampleCompactDijkstraTestCases)
+    test_instance.random_test(Johnson, 20)
+    assert test_instance.stats.calls > 0
+
+    def off_by_one(G: CompactGraph) -> np.ndarray:
+        dist = Floyd(G)
+        dist[0, 1:] += 1
+        return dist
+    with pytest.raises(AssertionError, match=r"in \d+/\d+ graphs, first: graph 0 \(0, 1\)"):
+        test_instance.full_test(off_by_one, max_report=3)
+    with pytest.raises(AssertionError, match="shortest paths mismatched"):
+        def wrong_sign_algorithm(G: CompactGraph) -> np.ndarray:
+            dist = Floyd(G)
+            return np.where(np.isinf(dist), -np.inf, dist)
+        test_instance.full_test(wrong_sign_algorithm)
+
+def test_distance_cache(tmp_path, monkeypatch):
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class2/lite_class2_test_cases1.json')
+    graphs = [data['graph'] for data in test_instance.test_cases]
+    cache = DistanceCache(str(tmp_path / 'cache'))
+    expected = FloydBatch(graphs, cache=cache)
+    assert cache.misses == len(graphs) and len(cache) == len(graphs)
+
+    # 命中时不再计算; 边的顺序与CompactGraph/networkx表示不影响键
+    monkeypatch.setattr(algorithm, '_floydWarshall', None)
+    for G, dist in zip(graphs, expected):
+        shuffled = nx.DiGraph()
+        shuffled.add_nodes_from(G.nodes())
+        shuffled.add_weighted_edges_from(random.sample(list(G.edges(data='weight')), G.number_of_edges()))
+        assert np.array_equal(Floyd(shuffled, cache=cache), dist)
+        assert np.array_equal(Johnson(CompactGraph.fromNetworkx(G), cache=cache), dist)
+    assert cache.hits == 2 * len(graphs)
+    monkeypatch.undo()
+
+    # 不同dtype与算法版本变化都视为未命中
+    Floyd(graphs[0], dtype=np.int32, cache=cache)
+    monkeypatch.setitem(algorithm.APSP_VERSIONS, 'FloydBatch', 2)
+    assert cache.get(algorithm._graphKey(graphs[0], np.float64), algorithm.APSP_VERSIONS) is None
+    monkeypatch.undo()
+
+    # 含负权重环的图: 无意义的Floyd矩阵不写入, 已有的此类条目也视为未命中
+    cycle = CompactGraph(3, [0, 1, 2], [1, 2, 0], [1.0, -3.0, 1.0], directed=True)
+    cycle_cache = DistanceCache(str(tmp_path / 'cycle'))
+    assert (np.diag(Floyd(cycle, cache=cycle_cache)) < 0).any() and len(cycle_cache) == 0
+    with pytest.raises(NegativeCycleError):
+        Johnson(cycle, cache=cycle_cache)
+    key = algorithm._graphKey(cycle, np.float64)
+    cycle_cache.put(key, np.zeros((3, 3)), 'Floyd', algorithm.APSP_VERSIONS['Floyd'])
+    np.save(tmp_path / 'cycle' / f'{key}.npy', Floyd(cycle))
+    assert cycle_cache.get(key, algorithm.APSP_VERSIONS) is None
+
+    small = DistanceCache(str(tmp_path / 'small'), maxBytes=3 * expected[0].nbytes)
+    for G in graphs[:5]:
+        Floyd(G, cache=small)
+    assert len(small) <= 3
+    assert small.get(algorithm._graphKey(graphs[4], np.float64), algorithm.APSP_VERSIONS) is not None
+
+def test_dynamic_apsp():
+    rng = random.Random(18)
+    for directed in [True, False]:
+        G = generateRandomCompactGraph(40, edges=120, directed=directed, weightRange=(0, 20), seed=18)
+        dynamic = DynamicAPSP(G, Floyd(G))
+        for _ in range(200):
+            u, v = rng.sample(range(40), 2)
+            if np.isfinite(dynamic.weight[u, v]) and rng.random() < 0.3:
+                assert not dynamic.removeEdge(u, v)
+            else:
+                assert not dynamic.setEdge(u, v, rng.randint(0, 30))
+            src, dst = np.nonzero(np.triu(np.isfinite(dynamic.weight)) if not directed else np.isfinite(dynamic.weight))
+            expected = Floyd(CompactGraph(40, src, dst, dynamic.weight[src, dst], directed=directed))
+            assert np.array_equal(dynamic.dist, expected)
+
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class2/lite_class2_test_cases1.json')
+    G = test_instance.test_cases[0]['graph']
+    dynamic = DynamicAPSP(G)
+    u, v = next(iter(G.edges()))
+    assert dynamic.setEdge(v, u, -dynamic[u, v] - 1)
+    assert dynamic.negativeCycle
+    assert not dynamic.removeEdge(v, u)
+    assert np.array_equal(dynamic.dist, test_instance.test_cases[0]['shortest_path_matrix'])
+    with pytest.raises(KeyError):
+        dynamic.removeEdge(v, u)
+
+def test_FloydBlocked(tmp_path):
+    for test_cases_file, dtype in [('data/sample_test_cases/class2/medium_class2_test_cases1.json', np.float64),
+                                   ('data/sample_test_cases/class3/lite_class3_test_cases1.json', np.int32)]:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        for test_data in test_instance.test_cases[:4]:
+            G = test_data['compact_graph']
+            expected = Floyd(G, dtype=dtype)
+            for blockSize, workers in [(7, 1), (16, 3), (None, 2)]:
+                dist = FloydBlocked(G, dtype=dtype, blockSize=blockSize, workers=workers)
+                assert isinstance(dist, np.memmap) and np.array_equal(dist, expected)
+
+    G = generateRandomCompactGraph(300, edges=2000, directed=False, weightRange=(1, 50), seed=19)
+    stats = SearchStats()
+    dist = FloydBlocked(G, path=str(tmp_path / 'dist.bin'), memoryBudget=64 * 64 * 8 * 4 * 2, workers=2, stats=stats)
+    assert np.array_equal(dist, Floyd(G)) and stats.relaxAttempts == 300 ** 3
+    assert np.array_equal(np.memmap(tmp_path / 'dist.bin', dtype=np.float64, shape=(300, 300)), dist)
+
+def test_packed_Floyd2():
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class1/medium_class1_test_cases1.json')
+    undirected = [data for data in test_instance.test_cases if not data['graph'].is_directed()]
+    assert undirected
+    for test_data in undirected:
+        expected = test_data['shortest_path_matrix']
+        n = len(expected)
+        dist = Floyd2(test_data['compact_graph'], packed=True)
+        assert isinstance(dist, PackedSymmetricMatrix) and dist.shape == (n, n)
+        assert np.array_equal(dist.toDense(), expected) and np.array_equal(np.asarray(dist), expected)
+        assert dist.nbytes <= (n + 1) * (n + 2) // 2 * 8
+        i, j = np.random.randint(0, n, size=(2, 20))
+        assert np.array_equal(dist[i, j], expected[i, j]) and dist[int(i[0]), int(j[0])] == expected[i[0], j[0]]
+        assert np.array_equal(PackedSymmetricMatrix.fromDense(expected).data, dist.data)
+
+    for n in [1, 2, 5]:
+        G = generateRandomCompactGraph(n, edges=n - 1, directed=False, seed=20)
+        assert np.array_equal(Floyd2(G, packed=True, dtype=np.float32).toDense(), Floyd(G, dtype=np.float32))
+    with pytest.raises(ValueError, match="undirected"):
+        Floyd2(CompactGraph(2, [0], [1], [1.0], directed=True), packed=True)
+    with pytest.raises(ValueError, match="floating"):
+        Floyd2(G, dtype=np.int32, packed=True)
+
+def samplePathTestCases(graph: CompactGraph, start: int, end: int) -> list:
+    _, pred = BellmanFoldSPFA(graph, start, returnPath=True)
+    return reconstructPath(pred, start, end)
+
+def test_path_reconstruction(tmp_path):
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class2/lite_class2_test_cases1.json')
+    graphs = [data['graph'] for data in test_instance.test_cases]
+    tm.save_graph_list_to_json(graphs, str(tmp_path / 'paths.json'), next_hop=True)
+    test_instance.setup_method(test_cases_file=str(tmp_path / 'paths.json'))
+    for test_data in test_instance.test_cases:
+        G = test_data['compact_graph']
+        expected = test_data['shortest_path_matrix']
+        n = len(G)
+        dist, nextHop = Floyd(G, returnPath=True)
+        assert np.array_equal(dist, expected) and nextHop.dtype == np.int16
+        assert np.array_equal(nextHop, test_data['next_hop_matrix'])
+        assert np.array_equal(Floyd(G, dtype=np.int32, returnPath=True)[1], nextHop)
+        for s in range(n):
+            results = [BellmanFord(G, s, returnPath=True), BellmanFoldSPFA(G, s, slf=True, returnPath=True)]
+            for dist, pred in results:
+                assert np.array_equal(dist, expected[s])
+            for t in range(n):
+                path = list(iterNextHop(nextHop, s, t))
+                assert (path == []) == np.isinf(expected[s, t])
+                if path:
+                    assert path[0] == s and path[-1] == t
+                    assert sum(test_data['graph'][u][v]['weight'] for u, v in zip(path, path[1:])) == expected[s, t]
+                for _, pred in results:
+                    other = reconstructPath(pred, s, t)
+                    assert len(other) == 0 or sum(test_data['graph'][u][v]['weight'] for u, v in zip(other, other[1:])) == expected[s, t]
+    test_instance.path_test(samplePathTestCases, 20)
+    with pytest.raises(AssertionError, match="reference"):
+        def wrong_path_algorithm(G: CompactGraph, start: int, end: int) -> list:
+            return [start, end]
+        test_instance.path_test(wrong_path_algorithm, 20)
+
+    tm.save_test_cases_to_binary(test_instance.test_cases, str(tmp_path / 'binary'))
+    binary = tm.load_graph_list_from_binary(str(tmp_path / 'binary'))
+    assert all(np.array_equal(binary[i]['next_hop_matrix'], data['next_hop_matrix']) and binary[i]['next_hop_matrix'].dtype == np.int16
+               for i, data in enumerate(test_instance.test_cases))
+    assert nextHopDtype(32768) == np.int16 and nextHopDtype(32769) == np.int32
+
+    test_instance.setup_method(test_cases_file='data/sample_test_cases/class3/lite_class3_test_cases1.json')
+    for test_data in test_instance.test_cases:
+        G = test_data['compact_graph']
+        for s in range(len(G)):
+            for heap in ['binary', 'pairing', 'dial', 'radix']:
+                dist, pred = Dijsktra(G, s, heap=heap, returnPath=True)
+                for t in range(len(G)):
+                    path = reconstructPath(pred, s, t)
+                    assert (path == []) == np.isinf(dist[t])
+                    assert sum(test_data['graph'][u][v]['weight'] for u, v in zip(path, path[1:])) == (dist[t] if path else 0)
+    batch = FloydBatch([data['graph'] for data in test_instance.test_cases], returnPath=True)
+    assert all(np.array_equal(Floyd(data['graph'], returnPath=True)[1], nextHop) for data, (_, nextHop) in zip(test_instance.test_cases, batch))
+
+    dist, pred = BellmanFord(CompactGraph(3, [0, 1, 2], [1, 2, 1], [1.0, -2.0, 1.0]), 0, returnPath=True)
+    assert np.isneginf(dist[1]) and pred[1] == -1
+
+def test_point_to_point():
+    for test_cases_file in ['data/sample_test_cases/class1/medium_class1_test_cases1.json',
+                            'data/sample_test_cases/class3/lite_class3_test_cases2.json']:
+        test_instance = tm.TestClass()
+        test_instance.setup_method(test_cases_file=test_cases_file)
+        test_instance.random_test(BidirectionalDijkstra, 50)
+        for test_data in test_instance.test_cases[:4]:
+            G = test_data['compact_graph']
+            expected = test_data['shortest_path_matrix']
+            index = LandmarkIndex(G, k=4, seed=22)
+            for s in range(len(G)):
+                for t in range(len(G)):
+                    assert BidirectionalDijkstra(G, s, t) == expected[s][t]
+                    assert index.query(s, t) == expected[s][t]
+                    assert index.lowerBound(s, t) <= expected[s][t]
+
+    G = generateRandomCompactGraph(2000, edges=8000, directed=True, weightRange=(1, 100), seed=22)
+    index = LandmarkIndex(G, k=8, seed=22)
+    assert len(set(index.landmarks)) == 8 and index.fromLandmark.shape == (2000, 8)
+    plain, bidirectional, alt = SearchStats(), SearchStats(), SearchStats()
+    rng = random.Random(22)
+    for _ in range(20):
+        s, t = rng.sample(range(2000), 2)
+        expected = Dijsktra(G, s, t, stats=plain)[t]
+        assert BidirectionalDijkstra(G, s, t, stats=bidirectional) == expected
+        assert index.query(s, t, stats=alt) == expected
+    assert alt.settled < plain.settled and bidirectional.settled < plain.settled
+    assert LandmarkIndex(G, k=3, method='random', seed=1).query(0, 1) == Dijsktra(G, 0, 1)[1]
+    with pytest.raises(ValueError, match="non-negative"):
+        BidirectionalDijkstra(CompactGraph(2, [0], [1], [-1.0]), 0, 1)
+    with pytest.raises(ValueError, match="non-negative"):
+        LandmarkIndex(CompactGraph(2, [0], [1], [-1.0]))
+
+def slowAlgorithm(G: CompactGraph, stats: SearchStats = None) -> np.ndarray:
+    time.sleep(10)
+    return Floyd(G)
+
+def brokenAlgorithm(G: CompactGraph, stats: SearchStats = None) -> np.ndarray:
+    raise RuntimeError("broken")
+
+def greedyAlgorithm(G: CompactGraph, stats: SearchStats = None) -> np.ndarray:
+    buffer = np.ones(80 << 17)
+    return Floyd(G) + buffer[0] - 1
+
+def test_runner(tmp_path, monkeypatch):
+    suite = 'data/sample_test_cases/class2/lite_class2_test_cases1.json'
+    data_list = tm.load_graph_list_from_json(suite)
+    streamed = list(runner.iterTestCases(suite, chunkSize=256))
+    assert len(streamed) == len(data_list)
+    assert np.array_equal(runner._parseMatrix(streamed[-1]['shortest_path_matrix']), data_list[-1]['shortest_path_matrix'], equal_nan=True)
+
+    output = tmp_path / 'run.jsonl'
+    assert runner.main(['BellmanFord', 'data/sample_test_cases/class[12]/lite_*1.json', '--workers', '3', '--output', str(output)]) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(records) == len(data_list) + len(tm.load_graph_list_from_json('data/sample_test_cases/class1/lite_class1_test_cases1.json'))
+    assert all(record['status'] == 'ok' and record['peak_rss'] >= 0 for record in records)
+    assert all(record['correct'] is (None if data['shortest_path_matrix'] is None else True)
+               for record in records if record['file'] == suite for data in [data_list[record['index']]])
+
+    # 中断时最后一行只写了一半: 恢复运行只补算缺失的用例
+    lines = output.read_text().splitlines(keepends=True)
+    output.write_text(''.join(lines[:-3]) + lines[-3][:10])
+    resumed = runner.runSuite('BellmanFord', ['data/sample_test_cases/class[12]/lite_*1.json'], str(output), workers=2, resume=True)
+    assert len(resumed) == 3
+    keys = [(record['file'], record['index']) for record in map(json.loads, output.read_text().splitlines())]
+    assert sorted(keys) == sorted((record['file'], record['index']) for record in records)
+
+    monkeypatch.setitem(runner.ALGORITHMS, 'Slow', (slowAlgorithm, 'all_pairs', False, False, False, False))
+    start = time.monotonic()
+    records = runner.runSuite('Slow', [suite], str(tmp_path / 'slow.jsonl'), workers=len(data_list), timeout=0.5)
+    assert time.monotonic() - start < 5 and all(record['status'] == 'timeout' for record in records)
+    # 不适用的用例记为skipped, 出错或超时使退出码非0
+    records = runner.runSuite('Dijsktra', [suite], str(tmp_path / 'skipped.jsonl'), workers=2)
+    assert any(record['status'] == 'skipped' for record in records) and all(record['status'] != 'error' for record in records)
+    assert runner.main(['Floyd2Packed', 'data/sample_test_cases/class1/lite_class1_test_cases1.json', '--output', str(tmp_path / 'packed.jsonl')]) == 0
+    monkeypatch.setitem(runner.ALGORITHMS, 'Broken', (brokenAlgorithm, 'all_pairs', False, False, False, False))
+    assert runner.main(['Broken', suite, '--output', str(tmp_path / 'broken.jsonl')]) == 1
+
+    # 峰值内存只计子进程自身的增长, 不含fork时继承的父进程内存
+    parent = np.ones(200 << 17)
+    monkeypatch.setitem(runner.ALGORITHMS, 'Greedy', (greedyAlgorithm, 'all_pairs', False, False, False, False))
+    records = runner.runSuite('Greedy', [suite], str(tmp_path / 'greedy.jsonl'), workers=2)
+    assert all(60 << 20 <= record['peak_rss'] < parent.nbytes for record in records)
+    # Dial返回整数距离, 不可达的哨兵值需与参考矩阵中的inf比较
+    unreachable = 'data/sample_test_cases/class3/lite_class3_test_cases1.json'
+    assert any(np.isinf(data['shortest_path_matrix']).any() for data in tm.load_graph_list_from_json(unreachable))
+    records = runner.runSuite('Dial', [unreachable], str(tmp_path / 'dial.jsonl'), workers=2)
+    assert records and all(record['correct'] for record in records)
+    for name in ['FloydBatch', 'ALT']:
+        records = runner.runSuite(name, ['data/sample_test_cases/class1/lite_class1_test_cases1.json'], str(tmp_path / f'{name}.jsonl'), workers=2)
+        assert all(record['correct'] for record in records)
+
+def fakeRender(self, filename, directory, format, view=False):
+    # 测试环境不要求安装graphviz可执行文件, 只写出dot源文件与空PNG
+    with open(os.path.join(directory, filename), 'w') as f:
+        f.write(self.source)
+    with open(os.path.join(directory, f'{filename}.{format}'), 'wb') as f:
+        f.write(b'')
+    return os.path.join(directory, f'{filename}.{format}')
+
+def test_render_graphs(tmp_path, monkeypatch):
+    monkeypatch.setattr(graphviz.Graph, 'render', fakeRender)
+    monkeypatch.setattr(graphviz.Digraph, 'render', fakeRender)
+    monkeypatch.chdir(tmp_path)
+    test_instance = tm.TestClass()
+    test_instance.setup_method(test_cases_file=os.path.join(os.path.dirname(__file__), '..', 'data/sample_test_cases/class4/medium_class4_test_cases1.json'))
+    graphs = [data['graph'] for data in test_instance.test_cases[:4]]
+    assert not (tmp_path / 'data').exists()
+
+    shuffled = nx.DiGraph() if graphs[0].is_directed() else nx.Graph()
+    shuffled.add_nodes_from(reversed(list(graphs[0].nodes())))
+    shuffled.add_weighted_edges_from(reversed(list(graphs[0].edges(data='weight'))))
+    # 替换的render只在当前进程中生效, 不经过进程池
+    paths = ioProcess.renderGraphs(graphs + [shuffled], workers=1, maxNodes=10)
+    assert paths[0] == paths[-1] and len(set(paths)) == 4
+    for path, G in zip(paths, graphs):
+        assert os.path.isfile(path)
+        source = (tmp_path / 'data/graphs' / os.path.basename(path)[:-len('.png')]).read_text()
+        assert source.count('fillcolor=lightblue') == min(len(G), 10)
+
+    # 已渲染的图直接跳过
+    monkeypatch.setattr(graphviz.Graph, 'render', None)
+    monkeypatch.setattr(graphviz.Digraph, 'render', None)
+    assert ioProcess.renderGraphs(graphs, workers=1, maxNodes=10) == paths[:4]
+
+    G = nx.path_graph(100)
+    nx.set_edge_attributes(G, 1, 'weight')
+    assert set(ioProcess.downsampleGraph(G, maxNodes=10, centers=[50], hops=2)) == {48, 49, 50, 51, 52}
+    assert len(ioProcess.downsampleGraph(G, maxNodes=3, centers=[50], hops=2)) == 3
+    assert len(ioProcess.downsampleGraph(G, maxNodes=10, seed=1)) == 10
+    assert ioProcess.downsampleGraph(G, maxNodes=None) is G
+    assert ioProcess.graphHash(nx.Graph([(1, 2)])) != ioProcess.graphHash(nx.Graph([('1', '2')]))
+
 def test_performance(benchmark):
     # 使用 benchmark 固件来测量 sum 函数的性能
     test_instance = tm.TestClass()
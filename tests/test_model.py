@@ -1,9 +1,10 @@
-import random
 import os
 import json
 import sys
 import importlib
 import inspect
+import functools
+import typing
 
 import pytest
 import networkx as nx
@@ -11,22 +12,42 @@ import tests.test_cases as tc
 import numpy as np
 import codes.ioProcess as ioProcess
 
+from collections.abc import Sequence
 from networkx.readwrite import json_graph
-from codes.algorithm import Floyd
+from codes.algorithm import Floyd, FloydBatch
+from codes.cache import DistanceCache
+from codes.compactGraph import CompactGraph
+from codes.path import nextHopDtype, iterNextHop
+from codes.stats import SearchStats
 from codes.ioProcess import renderGraph
 
 class TestClass:
     def setup_method(self, test_cases_file: str = None) -> None:
         self.test_cases = []
-        if test_cases_file is not None:
+        self.stats = SearchStats()
+        if test_cases_file is not None and os.path.isfile(os.path.join(test_cases_file, 'index.json')):
+            self.test_cases = load_graph_list_from_binary(test_cases_file)
+        elif test_cases_file is not None and os.path.isdir(test_cases_file):
+            # 普通目录: 依次加载其中所有JSON测试用例文件, 如某一等价类的整个目录
+            for file_name in sorted(os.listdir(test_cases_file)):
+                if file_name.endswith('.json'):
+                    self.test_cases.extend(load_graph_list_from_json(os.path.join(test_cases_file, file_name)))
+        elif test_cases_file is not None:
             self.test_cases = load_graph_list_from_json(test_cases_file)
 
     def random_test(self, test_algorithm: callable = None, num: int = 10) -> None:
         """接受待测试算法函数，随机选择最短路起点和终点进行测试
 
         Args:
-            test_algorithm (function, optional): 待测试算法函数. Defaults to None. 函数需要按序接受三个参数，即networkx.Graph或networkx.DiGraph对象作为输入图，int类型的起点和终点，返回float类型的最短路径长度
+            test_algorithm (function, optional): 待测试算法函数. Defaults to None. 支持三种形式:
+                1. 按序接受networkx.Graph或networkx.DiGraph对象作为输入图，int类型的起点和终点，返回float类型的最短路径长度
+                2. 批量查询: 接受输入图，np.ndarray类型的起点数组和终点数组，返回对应的最短路径长度数组，每个图只调用一次
+                3. 单源: 接受输入图和int类型的起点，返回起点到各点的最短路径长度数组，每个起点只调用一次
+                4. 全源: 只接受输入图，返回最短路矩阵，每个图只调用一次
+                第一个参数标注为CompactGraph(或含CompactGraph的Union)时，传入加载时已转换好的紧凑图
             num (int, optional): 每一个测试case选取的点对数量. Defaults to 10.
+
+            test_algorithm有stats参数时传入self.stats, 测试结束后可从self.stats读取累计的运行统计
         """
 
         # 检查输入
@@ -34,33 +55,207 @@ class TestClass:
             raise ValueError("No test cases loaded")
         if test_algorithm is None:
             raise ValueError("missing test_algorithm parameter")
-        test_algorithm_signature = inspect.signature(test_algorithm)
-        test_algorithm_parameters = test_algorithm_signature.parameters
-        if len(test_algorithm_parameters) != 3:
-            raise ValueError("test_algorithm should accept 3 parameters")
-        if test_algorithm_signature.return_annotation != float:
-            raise ValueError("test_algorithm should return float type")
-        param_types = [set([nx.Graph, nx.DiGraph]), set([int]), set([int])]
-        for parms, expected_type in zip(test_algorithm_parameters.values(), param_types):
-            if parms.annotation not in expected_type:
-                raise ValueError("test_algorithm parameter type error")
-        
+        mode, use_compact_graph = check_test_algorithm(test_algorithm)
+        if 'stats' in inspect.signature(test_algorithm).parameters:
+            test_algorithm = functools.partial(test_algorithm, stats=self.stats)
+
         # 随机测试
         for test_data in self.test_cases:
-            G = test_data['graph']
+            G = test_data['compact_graph'] if use_compact_graph else test_data['graph']
+            shortest_path_matrix = test_data['shortest_path_matrix']
+            if shortest_path_matrix is None:
+                continue
+            n = len(G)
+            sources = np.random.randint(0, n, size=num)
+            targets = np.random.randint(0, n, size=num)
+            if mode == 'all_pairs':
+                results = np.asarray(test_algorithm(G), dtype=np.float64)[sources, targets]
+            elif mode == 'batch':
+                results = np.asarray(test_algorithm(G, sources, targets), dtype=np.float64)
+            elif mode == 'single_source':
+                results = np.empty(num)
+                for s in np.unique(sources):
+                    mask = sources == s
+                    results[mask] = np.asarray(test_algorithm(G, int(s)))[targets[mask]]
+            else:
+                results = np.array([test_algorithm(G, int(s), int(t)) for s, t in zip(sources, targets)], dtype=np.float64)
+            assert_shortest_path_equal(results, shortest_path_matrix[sources, targets], sources, targets)
+
+    def full_test(self, test_algorithm: callable = None, max_report: int = 5) -> dict:
+        """接受待测试算法函数，对每个测试case的所有点对(s, t)与最短路矩阵比较
+
+        全源算法每个图只调用一次, 单源算法每个起点调用一次, 批量查询算法每个图以全部n^2个点对调用一次,
+        只有逐点对形式的算法需要n^2次调用
+
+        Args:
+            test_algorithm (function, optional): 待测试算法函数, 支持的形式同random_test. Defaults to None.
+            max_report (int, optional): 出错时最多列出的错误点对数量. Defaults to 5.
+
+        Raises:
+            AssertionError: 存在错误点对, 信息中含错误点对与图的总数以及前max_report个错误点对
+
+        Returns:
+            dict: 'graphs'为检查的图数, 'pairs'为检查的点对数
+        """
+        if len(self.test_cases) == 0:
+            raise ValueError("No test cases loaded")
+        if test_algorithm is None:
+            raise ValueError("missing test_algorithm parameter")
+        mode, use_compact_graph = check_test_algorithm(test_algorithm)
+        if 'stats' in inspect.signature(test_algorithm).parameters:
+            test_algorithm = functools.partial(test_algorithm, stats=self.stats)
+
+        checked_graphs = checked_pairs = wrong_graphs = wrong_pairs = 0
+        details = []
+        for index, test_data in enumerate(self.test_cases):
+            G = test_data['compact_graph'] if use_compact_graph else test_data['graph']
+            shortest_path_matrix = test_data['shortest_path_matrix']
+            if shortest_path_matrix is None:
+                continue
+            n = len(G)
+            if mode == 'all_pairs':
+                results = np.asarray(test_algorithm(G), dtype=np.float64)
+            elif mode == 'single_source':
+                results = np.array([np.asarray(test_algorithm(G, s), dtype=np.float64) for s in range(n)]).reshape(n, n)
+            elif mode == 'batch':
+                sources, targets = np.divmod(np.arange(n * n), n)
+                results = np.asarray(test_algorithm(G, sources, targets), dtype=np.float64).reshape(n, n)
+            else:
+                results = np.array([[test_algorithm(G, s, t) for t in range(n)] for s in range(n)], dtype=np.float64).reshape(n, n)
+            wrong = np.argwhere(~shortest_path_mask(results, shortest_path_matrix))
+            checked_graphs += 1
+            checked_pairs += n * n
+            if len(wrong) > 0:
+                wrong_graphs += 1
+                wrong_pairs += len(wrong)
+                for s, t in wrong[:max_report - len(details)]:
+                    details.append(f"graph {index} ({s}, {t}): {results[s, t]} != {shortest_path_matrix[s, t]}")
+        if wrong_pairs > 0:
+            raise AssertionError(f"{wrong_pairs}/{checked_pairs} shortest paths mismatched in {wrong_graphs}/{checked_graphs} graphs, "
+                                 f"first: {', '.join(details)}")
+        return {'graphs': checked_graphs, 'pairs': checked_pairs}
+
+    def path_test(self, test_algorithm: callable = None, num: int = 10) -> None:
+        """接受返回最短路径的算法函数，随机选择起点和终点检查路径
+
+        检查路径首尾为起点与终点、相邻两点间有边且边权重之和等于存储的最短路长度, 不可达时应返回空列表;
+        出错信息中附带由测试用例存储的next-hop矩阵还原的参考路径(若有), 不需要额外计算
+
+        Args:
+            test_algorithm (function, optional): 待测试算法函数, 接受输入图、int类型的起点和终点，返回list类型的路径. Defaults to None.
+            num (int, optional): 每一个测试case选取的点对数量. Defaults to 10.
+        """
+        if len(self.test_cases) == 0:
+            raise ValueError("No test cases loaded")
+        if test_algorithm is None:
+            raise ValueError("missing test_algorithm parameter")
+        signature = inspect.signature(test_algorithm)
+        parameters = [parms for parms in signature.parameters.values()
+                      if parms.default is parms.empty and parms.kind in (parms.POSITIONAL_ONLY, parms.POSITIONAL_OR_KEYWORD)]
+        if len(parameters) != 3 or signature.return_annotation is not list:
+            raise ValueError("path test_algorithm should accept 3 parameters and return list type")
+        use_compact_graph = CompactGraph in (set(typing.get_args(parameters[0].annotation)) or {parameters[0].annotation})
+
+        for test_data in self.test_cases:
             shortest_path_matrix = test_data['shortest_path_matrix']
-            n = len(G.nodes)
-            for _ in range(num):
-                s = random.randint(0, n - 1)
-                t = random.randint(0, n - 1)
-                if np.isinf(shortest_path_matrix[s][t]):
-                    assert np.isinf(test_algorithm(G, s, t))
-                elif np.isnan(shortest_path_matrix[s][t]):
-                    assert np.isnan(test_algorithm(G, s, t))
+            if shortest_path_matrix is None:
+                continue
+            G = test_data['graph']
+            n = len(G)
+            for s, t in zip(np.random.randint(0, n, size=num).tolist(), np.random.randint(0, n, size=num).tolist()):
+                path = list(test_algorithm(test_data['compact_graph'] if use_compact_graph else G, s, t))
+                expected = shortest_path_matrix[s, t]
+                if np.isinf(expected):
+                    error = None if path == [] else "expected no path"
+                elif not path or path[0] != s or path[-1] != t:
+                    error = "path should start at the source and end at the target"
+                elif any(not G.has_edge(u, v) for u, v in zip(path, path[1:])):
+                    error = "path uses a missing edge"
+                elif not np.isclose(sum(G[u][v]['weight'] for u, v in zip(path, path[1:])), expected):
+                    error = f"path length != {expected}"
                 else:
-                    assert test_algorithm(G, s, t) == shortest_path_matrix[s][t]
-        
-        
+                    error = None
+                if error is not None:
+                    reference = None
+                    if test_data.get('next_hop_matrix') is not None:
+                        reference = list(iterNextHop(test_data['next_hop_matrix'], s, t))
+                    raise AssertionError(f"({s}, {t}): {error}, got {path}, reference {reference}")
+
+def check_test_algorithm(test_algorithm: callable) -> tuple:
+    """检查待测试算法函数的签名并判断其调用形式
+
+    Args:
+        test_algorithm (callable): 待测试算法函数, 有默认值的参数不计入参数个数
+
+    Returns:
+        tuple: (调用形式, 是否传入紧凑图), 调用形式为'scalar'、'batch'、'single_source'或'all_pairs'
+    """
+    test_algorithm_signature = inspect.signature(test_algorithm)
+    test_algorithm_parameters = [parms for parms in test_algorithm_signature.parameters.values()
+                                 if parms.default is parms.empty and parms.kind in (parms.POSITIONAL_ONLY, parms.POSITIONAL_OR_KEYWORD)]
+    return_type = test_algorithm_signature.return_annotation
+    if len(test_algorithm_parameters) == 3:
+        if return_type == float:
+            mode, index_type = 'scalar', int
+        elif return_type == np.ndarray:
+            mode, index_type = 'batch', np.ndarray
+        else:
+            raise ValueError("test_algorithm should return float type (or np.ndarray for batch algorithms)")
+    elif len(test_algorithm_parameters) == 2:
+        if return_type != np.ndarray:
+            raise ValueError("single-source test_algorithm should return np.ndarray type")
+        mode, index_type = 'single_source', int
+    elif len(test_algorithm_parameters) == 1 and return_type == np.ndarray:
+        mode, index_type = 'all_pairs', None
+    else:
+        raise ValueError("test_algorithm should accept 3 parameters (or 2 for single-source, 1 for all-pairs algorithms returning np.ndarray)")
+
+    graph_types = set(typing.get_args(test_algorithm_parameters[0].annotation)) or {test_algorithm_parameters[0].annotation}
+    if not graph_types & set([nx.Graph, nx.DiGraph, CompactGraph]):
+        raise ValueError("test_algorithm parameter type error")
+    for parms in test_algorithm_parameters[1:]:
+        if parms.annotation is not index_type:
+            raise ValueError("test_algorithm parameter type error")
+    return mode, CompactGraph in graph_types
+
+def assert_shortest_path_equal(results: np.ndarray, expected: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> None:
+    """向量化比较最短路结果, inf/nan按位置分别比较, 有限值用np.isclose比较
+
+    Args:
+        results (np.ndarray): 待测试算法的结果
+        expected (np.ndarray): 正确的最短路长度
+        sources (np.ndarray): 对应的起点
+        targets (np.ndarray): 对应的终点
+    """
+    results = np.asarray(results, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    correct = shortest_path_mask(results, expected)
+    if not correct.all():
+        wrong = np.flatnonzero(~correct)
+        details = ", ".join(f"({sources[i]}, {targets[i]}): {results[i]} != {expected[i]}" for i in wrong[:5])
+        raise AssertionError(f"{len(wrong)}/{len(expected)} shortest paths mismatched, first: {details}")
+
+def shortest_path_mask(results: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """逐位置判断最短路结果是否正确, inf(含符号)/nan按位置分别比较, 有限值用np.isclose比较
+
+    Args:
+        results (np.ndarray): 待测试算法的结果
+        expected (np.ndarray): 正确的最短路长度, 形状与results相同
+
+    Returns:
+        np.ndarray: 布尔数组, True表示该位置正确
+    """
+    results = np.asarray(results, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    inf_mask = np.isinf(expected)
+    nan_mask = np.isnan(expected)
+    finite_mask = ~(inf_mask | nan_mask)
+    correct = np.zeros(expected.shape, dtype=bool)
+    correct[inf_mask] = results[inf_mask] == expected[inf_mask]
+    correct[nan_mask] = np.isnan(results[nan_mask])
+    correct[finite_mask] = np.isclose(results[finite_mask], expected[finite_mask])
+    return correct
+
 def check_edge_weight(G: nx.Graph) -> bool:
     """检查图G的边是否有weight属性
 
@@ -114,28 +309,74 @@ def check_negative_cycle(G: nx.Graph) -> bool:
             break
     return flag
 
-def save_graph_list_to_json(graph_list: list, file_path: str):
+def verify_shortest_path_matrices(data_list: list) -> list:
+    """用批量Floyd算法重新计算并核对测试用例中存储的最短路矩阵
+
+    Args:
+        data_list (list): load_graph_list_from_json返回的测试用例列表
+
+    Returns:
+        list: 存储矩阵与重新计算结果不一致的测试用例下标
+    """
+    cases = [(i, data) for i, data in enumerate(data_list) if data['shortest_path_matrix'] is not None]
+    matrices = FloydBatch([data['compact_graph'] for _, data in cases])
+    return [i for (i, data), matrix in zip(cases, matrices)
+            if not np.array_equal(matrix, data['shortest_path_matrix'], equal_nan=True)]
+
+def graph_to_test_case(G: nx.Graph, short_path_matrix: np.ndarray = None, solvable: bool = None, cache: DistanceCache = None,
+                       next_hop_matrix: np.ndarray = None) -> dict:
+    """将图与其最短路矩阵转换为可JSON序列化的测试用例
+
+    Args:
+        G (nx.Graph): 输入图
+        short_path_matrix (np.ndarray, optional): 已计算的最短路矩阵. Defaults to None, 此时按需用Floyd算法计算.
+        solvable (bool, optional): 是否可计算最短路(边均有权重且无负权重环). Defaults to None, 此时重新检查.
+        cache (DistanceCache, optional): 按需计算最短路矩阵时使用的缓存. Defaults to None.
+        next_hop_matrix (np.ndarray, optional): Floyd(returnPath=True)得到的next-hop矩阵. Defaults to None, 此时不存储.
+
+    Returns:
+        dict: 含'graph'与'shortest_path_matrix'的测试用例, 不可计算时矩阵为None; 给定next_hop_matrix且可计算时另含'next_hop_matrix'
+    """
+    if solvable is None:
+        solvable = check_edge_weight(G) and (not check_negative_cycle(G))
+    if solvable:
+        if short_path_matrix is None:
+            short_path_matrix = Floyd(G, cache=cache)
+        short_path_matrix = short_path_matrix.tolist()
+        short_path_matrix = [[str(x) if np.isinf(x) or np.isnan(x) else x for x in row] for row in short_path_matrix]
+    else:
+        short_path_matrix = None
+    test_case = {
+        'graph': json_graph.node_link_data(G),
+        'shortest_path_matrix': short_path_matrix
+    }
+    if solvable and next_hop_matrix is not None:
+        test_case['next_hop_matrix'] = np.asarray(next_hop_matrix).tolist()
+    return test_case
+
+def save_graph_list_to_json(graph_list: list, file_path: str, cache: DistanceCache = None, next_hop: bool = False):
     """将图列表以JSON格式存储到文件, 用于测试用例
 
     Args:
         graph_list (list): 要存储的图列表
         file_path (str): 存储文件的路径
+        cache (DistanceCache, optional): 最短路矩阵缓存, 重复生成相同的图时直接读取. Defaults to None.
+        next_hop (bool, optional): 是否同时存储next-hop矩阵, 供path_test还原参考路径, 此时不使用cache. Defaults to False.
     """
-    data_list = []
     for G in graph_list:
         if not isinstance(G, nx.Graph):
             raise ValueError("Input graph_list should contain networkx.Graph objects")
-        if check_edge_weight(G) and (not check_negative_cycle(G)):
-            short_path_matrix = Floyd(G)
-            short_path_matrix = short_path_matrix.tolist()
-            short_path_matrix = [[str(x) if np.isinf(x) or np.isnan(x) else x for x in row] for row in short_path_matrix]
-        else:
-            short_path_matrix = None
-        data = {
-            'graph': json_graph.node_link_data(G),
-            'shortest_path_matrix': short_path_matrix
-        }
-        data_list.append(data)
+    # 所有可计算最短路的图一次性批量执行Floyd算法
+    solvable = [check_edge_weight(G) and (not check_negative_cycle(G)) for G in graph_list]
+    solvable_graphs = [G for G, flag in zip(graph_list, solvable) if flag]
+    if next_hop:
+        results = iter(FloydBatch(solvable_graphs, returnPath=True))
+    else:
+        results = ((matrix, None) for matrix in FloydBatch(solvable_graphs, cache=cache))
+    data_list = []
+    for G, flag in zip(graph_list, solvable):
+        matrix, next_hop_matrix = next(results) if flag else (None, None)
+        data_list.append(graph_to_test_case(G, matrix, flag, next_hop_matrix=next_hop_matrix))
     
     try:
         with open(file_path, 'w') as f:
@@ -150,7 +391,8 @@ def load_graph_list_from_json(file_path: str) -> list:
         file_path (str): JSON文件的路径
 
     Returns:
-        list: 读取的图列表
+        list: 读取的图列表, 每一项含networkx图'graph', 共享给所有算法的紧凑图'compact_graph', 'shortest_path_matrix'
+            与'next_hop_matrix'(文件中未存储时为None)
     """
     try:
         with open(file_path, 'r') as f:
@@ -164,9 +406,138 @@ def load_graph_list_from_json(file_path: str) -> list:
         if shortest_path_matrix is not None:
             shortest_path_matrix = [[float(x) if isinstance(x, str) and (x == 'inf' or x == '-inf' or x == 'nan') else x for x in row] for row in shortest_path_matrix]
             shortest_path_matrix = np.array(shortest_path_matrix)
+        next_hop_matrix = data_json.get('next_hop_matrix')
+        if next_hop_matrix is not None:
+            next_hop_matrix = np.array(next_hop_matrix, dtype=nextHopDtype(len(graph)))
         data = {
             'graph': graph,
-            'shortest_path_matrix': shortest_path_matrix
+            'compact_graph': CompactGraph.fromNodeLink(data_json['graph']),
+            'shortest_path_matrix': shortest_path_matrix,
+            'next_hop_matrix': next_hop_matrix
         }
         data_list.append(data)
     return data_list
+
+class BinaryTestCases(Sequence):
+    """以内存映射方式打开的二进制测试用例集合, 按下标访问时才构造对应的图
+
+    目录结构:
+        index.json: 每个图的点数、是否有向、在边数组与矩阵数组中的偏移
+        src.npy, dst.npy, weight.npy: 所有图的边数组首尾相接
+        matrices.npy: 所有最短路矩阵按行展平后首尾相接
+        next_hops.npy: 所有next-hop矩阵(类型为nextHopDtype(最大点数))按行展平后首尾相接, 只在有测试用例存储了next-hop矩阵时存在
+    """
+
+    def __init__(self, dir_path: str) -> None:
+        with open(os.path.join(dir_path, 'index.json'), 'r') as f:
+            self.index = json.load(f)['graphs']
+        self.src = np.load(os.path.join(dir_path, 'src.npy'), mmap_mode='r')
+        self.dst = np.load(os.path.join(dir_path, 'dst.npy'), mmap_mode='r')
+        self.weight = np.load(os.path.join(dir_path, 'weight.npy'), mmap_mode='r')
+        self.matrices = np.load(os.path.join(dir_path, 'matrices.npy'), mmap_mode='r')
+        next_hops_path = os.path.join(dir_path, 'next_hops.npy')
+        self.next_hops = np.load(next_hops_path, mmap_mode='r') if os.path.exists(next_hops_path) else None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> dict:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        entry = self.index[i]
+        n = entry['n']
+        edges = slice(entry['edge_offset'], entry['edge_offset'] + entry['num_edges'])
+        src, dst, weight = self.src[edges], self.dst[edges], self.weight[edges]
+        graph = nx.DiGraph() if entry['directed'] else nx.Graph()
+        graph.add_nodes_from(range(n))
+        graph.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+        shortest_path_matrix = None
+        if entry['matrix_offset'] is not None:
+            shortest_path_matrix = self.matrices[entry['matrix_offset']:entry['matrix_offset'] + n * n].reshape(n, n)
+        next_hop_matrix = None
+        if entry.get('next_hop_offset') is not None:
+            next_hop_matrix = self.next_hops[entry['next_hop_offset']:entry['next_hop_offset'] + n * n].reshape(n, n)
+        return {
+            'graph': graph,
+            'compact_graph': CompactGraph(n, src, dst, weight, entry['directed']),
+            'shortest_path_matrix': shortest_path_matrix,
+            'next_hop_matrix': next_hop_matrix
+        }
+
+def save_test_cases_to_binary(data_list: list, dir_path: str):
+    """将测试用例(含已计算的最短路矩阵)以二进制格式存储到目录, 图存为边数组, 矩阵存为原生float64数组
+
+    Args:
+        data_list (list): load_graph_list_from_json返回的测试用例列表
+        dir_path (str): 存储目录的路径
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    index = []
+    src_list, dst_list, weight_list, matrix_list, next_hop_list = [], [], [], [], []
+    edge_offset = matrix_offset = next_hop_offset = 0
+    for data in data_list:
+        G = data['graph']
+        edges = list(G.edges(data='weight'))
+        matrix = data['shortest_path_matrix']
+        next_hop_matrix = data.get('next_hop_matrix')
+        index.append({
+            'n': len(G),
+            'directed': G.is_directed(),
+            'edge_offset': edge_offset,
+            'num_edges': len(edges),
+            'matrix_offset': None if matrix is None else matrix_offset,
+            'next_hop_offset': None if next_hop_matrix is None else next_hop_offset
+        })
+        src_list += [u for u, _, _ in edges]
+        dst_list += [v for _, v, _ in edges]
+        weight_list += [w for _, _, w in edges]
+        edge_offset += len(edges)
+        if matrix is not None:
+            matrix_list.append(np.asarray(matrix, dtype=np.float64).ravel())
+            matrix_offset += len(G) * len(G)
+        if next_hop_matrix is not None:
+            next_hop_list.append(np.asarray(next_hop_matrix).ravel())
+            next_hop_offset += len(G) * len(G)
+    weight_dtype = np.int64 if all(isinstance(w, int) for w in weight_list) else np.float64
+    np.save(os.path.join(dir_path, 'src.npy'), np.array(src_list, dtype=np.int32))
+    np.save(os.path.join(dir_path, 'dst.npy'), np.array(dst_list, dtype=np.int32))
+    np.save(os.path.join(dir_path, 'weight.npy'), np.array(weight_list, dtype=weight_dtype))
+    np.save(os.path.join(dir_path, 'matrices.npy'), np.concatenate(matrix_list) if matrix_list else np.empty(0))
+    if next_hop_list:
+        # 与JSON加载时的类型一致
+        next_hop_dtype = nextHopDtype(max(entry['n'] for entry in index))
+        np.save(os.path.join(dir_path, 'next_hops.npy'), np.concatenate(next_hop_list).astype(next_hop_dtype))
+    with open(os.path.join(dir_path, 'index.json'), 'w') as f:
+        json.dump({'version': 1, 'graphs': index}, f)
+
+def load_graph_list_from_binary(dir_path: str) -> BinaryTestCases:
+    """以内存映射方式打开二进制测试用例目录
+
+    Args:
+        dir_path (str): save_test_cases_to_binary生成的目录
+
+    Returns:
+        BinaryTestCases: 与load_graph_list_from_json返回值同样按下标访问的测试用例集合
+    """
+    return BinaryTestCases(dir_path)
+
+def convert_json_test_cases_to_binary(src_root: str = 'data/sample_test_cases', dst_root: str = None) -> list:
+    """将src_root下所有JSON测试用例文件转换为二进制格式
+
+    Args:
+        src_root (str, optional): JSON测试用例根目录. Defaults to 'data/sample_test_cases'.
+        dst_root (str, optional): 输出根目录, 保持与src_root相同的子目录结构. Defaults to None, 即输出到JSON文件旁.
+
+    Returns:
+        list: 生成的二进制测试用例目录
+    """
+    dst_root = src_root if dst_root is None else dst_root
+    converted = []
+    for dir_name, _, file_names in sorted(os.walk(src_root)):
+        for file_name in sorted(file_names):
+            if not file_name.endswith('.json'):
+                continue
+            dir_path = os.path.join(dst_root, os.path.relpath(dir_name, src_root), file_name[:-len('.json')])
+            save_test_cases_to_binary(load_graph_list_from_json(os.path.join(dir_name, file_name)), dir_path)
+            converted.append(dir_path)
+    return converted